@@ -0,0 +1,49 @@
+import hashlib
+from functools import wraps
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """Build a strong, quoted ETag from arbitrary validator parts."""
+    raw = "|".join(str(part) for part in parts)
+    return quote_etag(hashlib.md5(raw.encode("utf-8")).hexdigest())
+
+
+def conditional_response(request, build, etag=None, last_modified=None):
+    """Return a bodyless 304 when the client's validators match, otherwise build().
+
+    ``last_modified`` is a datetime (or None); validators are only attached
+    to successful responses so error bodies are never revalidated.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = build()
+    if response.status_code in (200, 304):
+        if etag:
+            response["ETag"] = etag
+        if timestamp is not None:
+            response["Last-Modified"] = http_date(timestamp)
+    return response
+
+
+def conditional(validators):
+    """View decorator answering conditional GETs.
+
+    ``validators(request, *args, **kwargs)`` returns ``(etag, last_modified)``
+    and must be cheap: it runs before the view and decides whether the view
+    runs at all.
+    """
+    def decorator(view):
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+            etag, last_modified = validators(request, *args, **kwargs)
+            return conditional_response(
+                request, lambda: view(request, *args, **kwargs), etag, last_modified,
+            )
+        return inner
+    return decorator
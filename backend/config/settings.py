@@ -89,6 +89,36 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+REST_FRAMEWORK = {
+    # orjson-backed; both fall back to DRF's stdlib json when orjson is missing
+    "DEFAULT_RENDERER_CLASSES": [
+        "config.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "config.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
+# The catalogue version and response caches (properties/cache.py) must be
+# shared by every worker and management command for a save to invalidate
+# them everywhere, so production should set REDIS_URL (needs the redis
+# package). Without it each process keeps its own cache and its catalogue
+# version lapses after LOCAL_VERSION_TIMEOUT seconds instead.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+
+# Answer property list requests from an in-memory NumPy snapshot of the
+# catalogue instead of SQLite (properties/snapshot.py)
+PROPERTY_SNAPSHOT_ENGINE = False
+
 STATICFILES_DIRS = [
     BASE_DIR / "static",
     BASE_DIR.parent / "cms_templates" / "static",
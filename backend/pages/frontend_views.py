@@ -1,64 +1,126 @@
 from django.shortcuts import render
-from .models import PrivacyPolicy
+from django.utils.safestring import mark_safe
+from properties.fragments import cached_detail, render_cards
+from properties.views import detail_payload, list_payload
+from translations.bundles import get_bundle
+from translations.pages import get_page_keys
+from .models import PrivacyPolicy, HomePage, SellPage, ServicePage, AboutPage, ContactPage
+from .payloads import SCRIPT_ESCAPES, page_payload, page_payload_script
+
+# Query params immobili.html forwards from its URL to /api/properties/
+LISTING_FILTERS = ("location", "price_min", "price_max", "property_type")
+LISTING_PAGE_SIZE = 9
+HOME_PAGE_SIZE = 6
 
 
 def get_lang(request):
     """Get language from query param or cookie, default to 'it'."""
-    lang = request.GET.get("lang") or request.COOKIES.get("django_language", "it")
+    lang = (
+        request.GET.get("lang")
+        or request.COOKIES.get("locale")
+        or request.COOKIES.get("django_language", "it")
+    )
     return lang if lang in ("it", "en", "de") else "it"
 
 
+_translation_scripts = {}
+
+
+def translations_script(lang, page):
+    """The page's translation sub-bundle as JSON safe to place inside a <script> element."""
+    bundle = get_bundle(lang)
+    if bundle is None:
+        return ""
+    body, etag = bundle.subset_variants(get_page_keys().get(page, ()))["identity"]
+    cached = _translation_scripts.get((lang, page))
+    if cached is None or cached[0] != etag:
+        cached = _translation_scripts[(lang, page)] = (
+            etag, body.decode("utf-8").translate(SCRIPT_ESCAPES)
+        )
+    return cached[1]
+
+
+def render_page(request, template, page, model=None, context=None):
+    """Render a page with its translations and singleton content inlined as JSON."""
+    lang = get_lang(request)
+    context = dict(context or {})
+    context["lang"] = lang
+    context["i18n_json"] = mark_safe(translations_script(lang, page))
+    if model is not None:
+        context["page_json"] = mark_safe(page_payload_script(model, lang))
+    return render(request, template, context)
+
+
+def property_cards(params, kind):
+    """``{"cards": html, "count": n}`` for the first page of listings, or {} to leave it to the client."""
+    data = list_payload(params)
+    if not data or not data["results"]:
+        return {}
+    return {"cards": render_cards(data["results"], params["lang"], kind), "count": data["count"]}
+
+
 def home_view(request):
-    return render(request, "index.html")
+    lang = get_lang(request)
+    context = property_cards({"lang": lang, "page_size": HOME_PAGE_SIZE}, "home")
+    return render_page(request, "index.html", "index", HomePage, context)
 
 
 def chi_siamo_view(request):
-    return render(request, "chi-siamo.html")
+    return render_page(request, "chi-siamo.html", "chi-siamo", AboutPage)
 
 
 def servizi_view(request):
-    return render(request, "servizi.html")
+    return render_page(request, "servizi.html", "servizi", ServicePage)
 
 
 def vendi_view(request):
-    return render(request, "vendi.html")
+    return render_page(request, "vendi.html", "vendi", SellPage)
 
 
 def contatti_view(request):
-    return render(request, "contatti.html")
+    return render_page(request, "contatti.html", "contatti", ContactPage)
 
 
 def immobili_view(request):
-    return render(request, "immobili.html")
+    """Listings with the first page of cards for the URL's filters rendered server-side."""
+    lang = get_lang(request)
+    params = {name: request.GET[name] for name in LISTING_FILTERS if request.GET.get(name)}
+    params.update(sort="most_recent", lang=lang, page=1, page_size=LISTING_PAGE_SIZE)
+    context = property_cards(params, "listing")
+    return render_page(request, "immobili.html", "immobili", context=context)
 
 
 def property_detail_view(request, pk):
-    return render(request, "property-detail.html", {"property_id": pk})
+    """Server-rendered listing; 404 for missing or inactive properties."""
+    lang = get_lang(request)
+    detail = cached_detail(pk, lang, lambda: detail_payload(pk, lang))
+    context = {"property_id": pk, "detail": detail}
+    response = render_page(request, "property-detail.html", "property-detail", context=context)
+    if detail is None:
+        response.status_code = 404
+    return response
 
 
 def privacy_policy_view(request):
     lang = get_lang(request)
-    policy = PrivacyPolicy.load()
-
-    data_purposes = policy.get_field_translation("data_purposes", lang)
-    cookie_types = policy.get_field_translation("cookie_types", lang)
+    policy = page_payload(PrivacyPolicy, request, lang)
 
     context = {
-        "privacy_title": policy.get_field_translation("privacy_title", lang),
-        "data_controller": policy.get_field_translation("data_controller", lang),
-        "legal_basis": policy.get_field_translation("legal_basis", lang),
+        "privacy_title": policy["privacy_title"],
+        "data_controller": policy["data_controller"],
+        "legal_basis": policy["legal_basis"],
         "data_purposes_list": [
-            line.strip() for line in data_purposes.split("\n") if line.strip()
+            line.strip() for line in policy["data_purposes"].split("\n") if line.strip()
         ],
-        "data_sharing": policy.get_field_translation("data_sharing", lang),
-        "data_storage": policy.get_field_translation("data_storage", lang),
-        "retention_period": policy.get_field_translation("retention_period", lang),
-        "user_rights": policy.get_field_translation("user_rights", lang),
-        "cookie_title": policy.get_field_translation("cookie_title", lang),
+        "data_sharing": policy["data_sharing"],
+        "data_storage": policy["data_storage"],
+        "retention_period": policy["retention_period"],
+        "user_rights": policy["user_rights"],
+        "cookie_title": policy["cookie_title"],
         "cookie_types_list": [
-            line.strip() for line in cookie_types.split("\n") if line.strip()
+            line.strip() for line in policy["cookie_types"].split("\n") if line.strip()
         ],
-        "consent_requirements": policy.get_field_translation("consent_requirements", lang),
-        "cookies_listed": policy.get_field_translation("cookies_listed", lang),
+        "consent_requirements": policy["consent_requirements"],
+        "cookies_listed": policy["cookies_listed"],
     }
-    return render(request, "privacy-policy.html", context)
+    return render_page(request, "privacy-policy.html", "privacy-policy", PrivacyPolicy, context)
@@ -1,5 +1,7 @@
 from django.db import models
 
+from translations.db import localized_values
+
 
 LANGUAGES = ("it", "en", "de")
 
@@ -15,6 +17,8 @@ class SingletonModel(models.Model):
         abstract = True
 
     def save(self, *args, **kwargs):
+        if getattr(self, "_localized_lang", None):
+            raise ValueError("A localized singleton is read-only; use load() to edit it.")
         self.pk = 1
         super().save(*args, **kwargs)
 
@@ -23,6 +27,36 @@ class SingletonModel(models.Model):
         obj, created = cls.objects.get_or_create(pk=1)
         return obj
 
+    @classmethod
+    def translated_fields(cls):
+        return [f.name for f in cls._meta.concrete_fields if isinstance(f, models.JSONField)]
+
+    @classmethod
+    def load_localized(cls, lang="it"):
+        """Load the singleton with every translation field reduced to ``lang`` in SQL.
+
+        The JSON columns are deferred and replaced by their localized text,
+        so ``get_field_translation()`` returns it as-is. The instance is
+        read-only.
+        """
+        fields = cls.translated_fields()
+        queryset = cls.objects.filter(pk=1).defer(*fields).annotate(
+            **localized_values(dict.fromkeys(fields, False), lang)
+        )
+        obj = queryset.first()
+        if obj is None:
+            cls.load()
+            obj = queryset.first()
+        for name in fields:
+            obj.__dict__[name] = obj.__dict__.pop(f"{name}_localized")
+        obj._localized_lang = lang
+        return obj
+
+    @classmethod
+    def last_modified(cls):
+        """Return updated_at without loading the translation fields."""
+        return cls.objects.filter(pk=1).values_list("updated_at", flat=True).first()
+
     def get_field_translation(self, field_name, lang="it"):
         """Get translated value for a field, with fallback to Italian."""
         value = getattr(self, field_name, {})
@@ -0,0 +1,262 @@
+"""Localized singleton page payloads, shared by the JSON API and the frontend views.
+
+Payloads are kept in-process per (page, language) and rebuilt when the
+singleton's updated_at changes, so serving one costs a single
+``updated_at`` lookup. Cached payloads hold root-relative media paths so
+they do not depend on the requested host; the API makes them absolute
+per request, while the inlined page JSON keeps them relative.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import PrivacyPolicy, HomePage, SellPage, ServicePage, AboutPage, ContactPage
+
+# Characters escaped so JSON can be embedded in a <script> element
+SCRIPT_ESCAPES = {ord(">"): "\\u003E", ord("<"): "\\u003C", ord("&"): "\\u0026"}
+
+
+class MediaPath(str):
+    """Root-relative media URL that ``absolute_urls()`` resolves against a request."""
+
+
+def get_image_url(image_field):
+    """Get the media path of an image field."""
+    if image_field and hasattr(image_field, 'url'):
+        return MediaPath(image_field.url)
+    return ""
+
+
+def absolute_urls(value, request):
+    """Copy of a payload with every MediaPath made absolute for ``request``."""
+    if isinstance(value, MediaPath):
+        return request.build_absolute_uri(value)
+    if isinstance(value, dict):
+        return {key: absolute_urls(item, request) for key, item in value.items()}
+    if isinstance(value, list):
+        return [absolute_urls(item, request) for item in value]
+    return value
+
+
+def privacy_payload(policy, lang):
+    return {
+        "privacy_title": policy.get_field_translation("privacy_title", lang),
+        "data_controller": policy.get_field_translation("data_controller", lang),
+        "legal_basis": policy.get_field_translation("legal_basis", lang),
+        "data_purposes": policy.get_field_translation("data_purposes", lang),
+        "data_sharing": policy.get_field_translation("data_sharing", lang),
+        "data_storage": policy.get_field_translation("data_storage", lang),
+        "retention_period": policy.get_field_translation("retention_period", lang),
+        "user_rights": policy.get_field_translation("user_rights", lang),
+        "cookie_title": policy.get_field_translation("cookie_title", lang),
+        "cookie_types": policy.get_field_translation("cookie_types", lang),
+        "consent_requirements": policy.get_field_translation("consent_requirements", lang),
+        "cookies_listed": policy.get_field_translation("cookies_listed", lang),
+        "updated_at": policy.updated_at,
+    }
+
+
+def home_payload(page, lang):
+    return {
+        "about_section": {
+            "subtitle": page.get_field_translation("about_subtitle", lang),
+            "heading": page.get_field_translation("about_heading", lang),
+            "paragraph1": page.get_field_translation("about_paragraph1", lang),
+            "paragraph2": page.get_field_translation("about_paragraph2", lang),
+            "image": get_image_url(page.about_image),
+        },
+        "services_section": {
+            "subtitle": page.get_field_translation("services_subtitle", lang),
+            "heading": page.get_field_translation("services_heading", lang),
+            "paragraph1": page.get_field_translation("services_paragraph1", lang),
+            "paragraph2": page.get_field_translation("services_paragraph2", lang),
+            "image": get_image_url(page.services_image),
+        },
+        "service_icons": [
+            {
+                "title": page.get_field_translation("service_icon_1_title", lang),
+                "icon": get_image_url(page.service_icon_1_image),
+            },
+            {
+                "title": page.get_field_translation("service_icon_2_title", lang),
+                "icon": get_image_url(page.service_icon_2_image),
+            },
+            {
+                "title": page.get_field_translation("service_icon_3_title", lang),
+                "icon": get_image_url(page.service_icon_3_image),
+            },
+            {
+                "title": page.get_field_translation("service_icon_4_title", lang),
+                "icon": get_image_url(page.service_icon_4_image),
+            },
+            {
+                "title": page.get_field_translation("service_icon_5_title", lang),
+                "icon": get_image_url(page.service_icon_5_image),
+            },
+        ],
+        "updated_at": page.updated_at,
+    }
+
+
+def sell_payload(page, lang):
+    return {
+        "intro_section": {
+            "subtitle": page.get_field_translation("intro_subtitle", lang),
+            "heading": page.get_field_translation("intro_heading", lang),
+            "description": page.get_field_translation("intro_description", lang),
+            "image": get_image_url(page.intro_image),
+        },
+        "services": [
+            {
+                "title": page.get_field_translation("service_1_title", lang),
+                "description": page.get_field_translation("service_1_description", lang),
+                "icon": get_image_url(page.service_1_icon),
+            },
+            {
+                "title": page.get_field_translation("service_2_title", lang),
+                "description": page.get_field_translation("service_2_description", lang),
+                "icon": get_image_url(page.service_2_icon),
+            },
+            {
+                "title": page.get_field_translation("service_3_title", lang),
+                "description": page.get_field_translation("service_3_description", lang),
+                "icon": get_image_url(page.service_3_icon),
+            },
+            {
+                "title": page.get_field_translation("service_4_title", lang),
+                "description": page.get_field_translation("service_4_description", lang),
+                "icon": get_image_url(page.service_4_icon),
+            },
+            {
+                "title": page.get_field_translation("service_5_title", lang),
+                "description": page.get_field_translation("service_5_description", lang),
+                "icon": get_image_url(page.service_5_icon),
+            },
+        ],
+        "updated_at": page.updated_at,
+    }
+
+
+def services_payload(page, lang):
+    return {
+        "services": [
+            {
+                "title": page.get_field_translation("service_1_title", lang),
+                "description": page.get_field_translation("service_1_description", lang),
+                "icon": get_image_url(page.service_1_icon),
+                "image": get_image_url(page.service_1_image),
+            },
+            {
+                "title": page.get_field_translation("service_2_title", lang),
+                "description": page.get_field_translation("service_2_description", lang),
+                "icon": get_image_url(page.service_2_icon),
+                "image": get_image_url(page.service_2_image),
+            },
+            {
+                "title": page.get_field_translation("service_3_title", lang),
+                "description": page.get_field_translation("service_3_description", lang),
+                "icon": get_image_url(page.service_3_icon),
+                "image": get_image_url(page.service_3_image),
+            },
+            {
+                "title": page.get_field_translation("service_4_title", lang),
+                "description": page.get_field_translation("service_4_description", lang),
+                "icon": get_image_url(page.service_4_icon),
+                "image": get_image_url(page.service_4_image),
+            },
+            {
+                "title": page.get_field_translation("service_5_title", lang),
+                "description": page.get_field_translation("service_5_description", lang),
+                "icon": get_image_url(page.service_5_icon),
+                "image": get_image_url(page.service_5_image),
+            },
+        ],
+        "updated_at": page.updated_at,
+    }
+
+
+def about_payload(page, lang):
+    return {
+        "agency_section": {
+            "subtitle": page.get_field_translation("agency_subtitle", lang),
+            "heading": page.get_field_translation("agency_heading", lang),
+            "paragraph1": page.get_field_translation("agency_paragraph1", lang),
+            "paragraph2": page.get_field_translation("agency_paragraph2", lang),
+            "image": get_image_url(page.agency_image),
+        },
+        "team_members": [
+            {
+                "name": page.team_member_1_name,
+                "title": page.get_field_translation("team_member_1_title", lang),
+                "image": get_image_url(page.team_member_1_image),
+            },
+            {
+                "name": page.team_member_2_name,
+                "title": page.get_field_translation("team_member_2_title", lang),
+                "image": get_image_url(page.team_member_2_image),
+            },
+        ],
+        "updated_at": page.updated_at,
+    }
+
+
+def contact_payload(page, lang):
+    return {
+        "company_name": page.company_name,
+        "description": page.get_field_translation("description", lang),
+        "address": {
+            "building": page.address_building,
+            "street": page.address_street,
+            "city": page.address_city,
+        },
+        "contact": {
+            "phone_1": page.phone_1,
+            "phone_2": page.phone_2,
+            "email": page.email,
+            "whatsapp_number": page.whatsapp_number,
+        },
+        "map_embed_url": page.map_embed_url,
+        "social_links": {
+            "whatsapp": page.social_whatsapp,
+            "instagram": page.social_instagram,
+            "facebook": page.social_facebook,
+            "linkedin": page.social_linkedin,
+        },
+        "updated_at": page.updated_at,
+    }
+
+
+PAYLOAD_BUILDERS = {
+    PrivacyPolicy: privacy_payload,
+    HomePage: home_payload,
+    SellPage: sell_payload,
+    ServicePage: services_payload,
+    AboutPage: about_payload,
+    ContactPage: contact_payload,
+}
+
+_payloads = {}
+
+
+def _cached_payload(model, lang):
+    key = (model._meta.label, lang)
+    updated_at = model.last_modified()
+    cached = _payloads.get(key)
+    if cached is None or updated_at is None or cached["updated_at"] != updated_at:
+        page = model.load_localized(lang)
+        cached = {"updated_at": page.updated_at, "payload": PAYLOAD_BUILDERS[model](page, lang)}
+        _payloads[key] = cached
+    return cached
+
+
+def page_payload(model, request, lang):
+    """The API payload of a singleton page in ``lang``, with absolute media URLs."""
+    return absolute_urls(_cached_payload(model, lang)["payload"], request)
+
+
+def page_payload_script(model, lang):
+    """The payload as JSON that is safe to place inside a <script> element."""
+    cached = _cached_payload(model, lang)
+    if "script" not in cached:
+        cached["script"] = json.dumps(cached["payload"], cls=DjangoJSONEncoder, ensure_ascii=False).translate(SCRIPT_ESCAPES)
+    return cached["script"]
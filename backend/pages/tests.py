@@ -0,0 +1,113 @@
+import json
+import re
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from translations.bundles import get_bundle
+from translations.pages import get_page_keys, subset
+
+from .models import AboutPage, ContactPage, HomePage, PrivacyPolicy, SellPage, ServicePage
+from .payloads import _payloads
+
+
+class InlinedPageDataTests(TestCase):
+    def setUp(self):
+        _payloads.clear()
+        HomePage.objects.create(
+            pk=1,
+            about_heading={"it": "Chi siamo", "en": "About </script><script>alert(1)</script> & us", "de": ""},
+            about_image="pages/home/about.png",
+        )
+
+    def script(self, response, element_id):
+        match = re.search(rf'<script id="{element_id}"[^>]*>(.*?)</script>', response.content.decode(), re.S)
+        return match.group(1)
+
+    def test_page_data_is_escaped_and_localized(self):
+        response = self.client.get("/", {"lang": "en"})
+        raw = self.script(response, "page-data")
+        self.assertNotIn("<", raw)
+        self.assertNotIn("&", raw)
+        data = json.loads(raw)
+        self.assertEqual(data["about_section"]["heading"], "About </script><script>alert(1)</script> & us")
+        self.assertEqual(data["about_section"]["image"], "/media/pages/home/about.png")
+        # missing translations fall back to Italian
+        german = json.loads(self.script(self.client.get("/", {"lang": "de"}), "page-data"))
+        self.assertEqual(german["about_section"]["heading"], "Chi siamo")
+
+    def test_translations_follow_the_locale_cookie(self):
+        self.client.cookies["locale"] = "de"
+        response = self.client.get("/")
+        self.assertContains(response, 'data-locale="de"')
+        data = json.loads(self.script(response, "i18n-data"))
+        self.assertEqual(data, subset(get_bundle("de").data, get_page_keys()["index"]))
+
+    def test_api_urls_are_absolute_per_host(self):
+        first = self.client.get("/api/page/home/", {"lang": "en"}, HTTP_HOST="a.example")
+        second = self.client.get("/api/page/home/", {"lang": "en"}, HTTP_HOST="b.example")
+        self.assertEqual(first.json()["about_section"]["image"], "http://a.example/media/pages/home/about.png")
+        self.assertEqual(second.json()["about_section"]["image"], "http://b.example/media/pages/home/about.png")
+        self.assertEqual(first.json()["service_icons"][0]["icon"], "")
+        # one cached payload serves every host
+        self.assertEqual(list(_payloads), [("pages.HomePage", "en")])
+
+
+class SingletonConditionalTests(TestCase):
+    pages = {
+        "/api/privacy-policy/": PrivacyPolicy,
+        "/api/page/home/": HomePage,
+        "/api/page/sell/": SellPage,
+        "/api/page/services/": ServicePage,
+        "/api/page/about/": AboutPage,
+        "/api/page/contact/": ContactPage,
+    }
+
+    def setUp(self):
+        _payloads.clear()
+        # A minute back, so a save lands in a later second
+        for model in self.pages.values():
+            model.load()
+            model.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+
+    def test_revalidation(self):
+        for url, model in self.pages.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, {"lang": "en"})
+                self.assertEqual(response.status_code, 200)
+                etag, last_modified = response["ETag"], response["Last-Modified"]
+
+                response = self.client.get(url, {"lang": "en"}, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b"")
+                response = self.client.get(url, {"lang": "en"}, HTTP_IF_MODIFIED_SINCE=last_modified)
+                self.assertEqual(response.status_code, 304)
+                # each language is its own representation
+                self.assertEqual(self.client.get(url, {"lang": "de"}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+                model.load().save()
+                self.assertEqual(self.client.get(url, {"lang": "en"}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+                response = self.client.get(url, {"lang": "en"}, HTTP_IF_MODIFIED_SINCE=last_modified)
+                self.assertEqual(response.status_code, 200)
+
+
+class LocalizedLoadTests(TestCase):
+    def test_sql_fallback_matches_get_field_translation(self):
+        HomePage.objects.create(
+            pk=1,
+            about_subtitle={"it": "Chi siamo", "en": "", "de": "Über uns"},
+            about_heading={"it": "Solo italiano"},
+            about_paragraph1={"en": "English only", "de": ""},
+            about_paragraph2={},
+            services_subtitle={"it": "", "en": "", "de": ""},
+            services_heading={"it": 'Caffè "al lago" \\ <b>', "en": None, "de": "Kaffee"},
+        )
+        page = HomePage.load()
+        for lang in ("it", "en", "de", "fr"):
+            localized = HomePage.load_localized(lang)
+            for name in HomePage.translated_fields():
+                with self.subTest(lang=lang, field=name):
+                    self.assertEqual(
+                        localized.get_field_translation(name, lang), page.get_field_translation(name, lang),
+                    )
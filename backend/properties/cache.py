@@ -0,0 +1,195 @@
+import hashlib
+import threading
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+
+CATALOGUE_VERSION_KEY = "properties:catalogue_version"
+RESPONSE_CACHE_TIMEOUT = 60 * 60 * 24
+# Lifetime of the catalogue version in a process-local cache (see _version_timeout)
+LOCAL_VERSION_TIMEOUT = 60
+PROCESS_LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+STATS_KEYS = {"hit": "properties:cache_hits", "miss": "properties:cache_misses"}
+
+# Query params that select rows; a subset of those that shape the response
+FILTER_PARAMS = (
+    "q", "location", "price_min", "price_max", "property_type",
+    "bbox", "near", "radius_km",
+)
+
+# Query params that change the API response; everything else is ignored
+RESPONSE_PARAMS = FILTER_PARAMS + (
+    "sort", "page", "page_size", "lang",
+    "pagination", "cursor", "include_total", "limit", "fields",
+)
+PARAM_DEFAULTS = {"page": "1", "lang": "it"}
+# Comma-separated params whose values form a set
+SET_PARAMS = ("fields",)
+
+# A detail payload only depends on the language and sparse fieldset, so
+# retrieve and batch requests share one cache entry per (property, lang, fields)
+DETAIL_PARAMS = ("lang", "fields")
+
+
+def load_catalogue_version():
+    """The id of the newest change-log entry (0 for an empty log).
+
+    Every property or gallery save/delete appends one entry, so the id
+    identifies the catalogue state and is the same in every process.
+    """
+    from .models import PropertyChange
+
+    return PropertyChange.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+
+def _version_timeout():
+    """None for a shared cache; LOCAL_VERSION_TIMEOUT for a process-local one.
+
+    A process-local cache never sees the bumps made by other workers or by
+    management commands, so its copy of the version lapses and is re-read
+    from the change log. An unchanged catalogue reads back the same
+    version, so nothing cached against it is dropped.
+    """
+    if settings.CACHES["default"]["BACKEND"] in PROCESS_LOCAL_BACKENDS:
+        return LOCAL_VERSION_TIMEOUT
+    return None
+
+
+def get_catalogue_version():
+    """Return the current catalogue version, reading it from the change log on a miss."""
+    version = cache.get(CATALOGUE_VERSION_KEY)
+    if version is None:
+        # A cache that stores nothing (DummyCache) reads the log on every call
+        version = load_catalogue_version()
+        cache.add(CATALOGUE_VERSION_KEY, version, _version_timeout())
+    return version
+
+
+def bump_catalogue_version():
+    """Publish the version of the change just logged, invalidating older cached responses."""
+    version = load_catalogue_version()
+    cache.set(CATALOGUE_VERSION_KEY, version, _version_timeout())
+    return version
+
+
+class CatalogueMemo:
+    """Process-local value rebuilt whenever the catalogue version changes.
+
+    ``build`` runs at most once per version per process; readers always see
+    a complete (version, value) pair because it is swapped in one assignment.
+    """
+
+    def __init__(self, build):
+        self.build = build
+        self._state = (None, None)
+        self._lock = threading.Lock()
+
+    def get(self):
+        version = get_catalogue_version()
+        if self._state[0] != version:
+            with self._lock:
+                if self._state[0] != version:
+                    self._state = (version, self.build())
+        return self._state[1]
+
+    def clear(self):
+        self._state = (None, None)
+
+
+def normalize_params(query_params, names=RESPONSE_PARAMS):
+    """Reduce query params to a stable, sorted tuple of the ones that matter."""
+    normalized = []
+    for name in names:
+        value = (query_params.get(name) or "").strip() or PARAM_DEFAULTS.get(name, "")
+        if name in SET_PARAMS:
+            # order and repeats of a sparse fieldset do not change the payload
+            value = ",".join(sorted({part.strip() for part in value.split(",") if part.strip()}))
+        if value:
+            normalized.append((name, value))
+    return tuple(normalized)
+
+
+def response_cache_key(request, action, pk=None, names=RESPONSE_PARAMS):
+    params = urlencode(normalize_params(request.query_params, names))
+    raw = f"{request.get_host()}|{action}|{pk}|{params}"
+    digest = hashlib.md5(raw.encode("utf-8")).hexdigest()
+    return f"properties:response:{get_catalogue_version()}:{digest}"
+
+
+def get_cached_for_filters(name, query_params, compute):
+    """Cache ``compute()`` per catalogue version and normalized filter params."""
+    # lang selects the full-text columns, so it is part of the row set
+    params = urlencode(normalize_params(query_params, FILTER_PARAMS + ("lang",)))
+    digest = hashlib.md5(params.encode("utf-8")).hexdigest()
+    key = f"properties:{name}:{get_catalogue_version()}:{digest}"
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, RESPONSE_CACHE_TIMEOUT)
+    return value
+
+
+def get_cached_count(queryset, query_params):
+    """COUNT(*) for a filtered queryset, computed once per catalogue version."""
+    return get_cached_for_filters("count", query_params, lambda: queryset.order_by().count())
+
+
+def detail_cache_key(request, pk):
+    return response_cache_key(request, "retrieve", pk, DETAIL_PARAMS)
+
+
+def _count(outcome, delta=1):
+    key = STATS_KEYS[outcome]
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key, delta)
+        except ValueError:  # a cache that stores nothing
+            pass
+
+
+def get_cached_response(key):
+    data = cache.get(key)
+    _count("miss" if data is None else "hit")
+    return data
+
+
+def set_cached_response(key, data):
+    cache.set(key, data, RESPONSE_CACHE_TIMEOUT)
+
+
+def get_cached_responses(keys):
+    """``{key: data}`` for the cached entries among ``keys``, in one round trip."""
+    found = cache.get_many(keys) if keys else {}
+    if found:
+        _count("hit", len(found))
+    if len(found) < len(keys):
+        _count("miss", len(keys) - len(found))
+    return found
+
+
+def set_cached_responses(entries):
+    cache.set_many(entries, RESPONSE_CACHE_TIMEOUT)
+
+
+def get_cache_stats():
+    """Return hit/miss counters and the hit ratio for the response cache."""
+    hits = cache.get(STATS_KEYS["hit"], 0)
+    misses = cache.get(STATS_KEYS["miss"], 0)
+    total = hits + misses
+    return {
+        "catalogue_version": get_catalogue_version(),
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / total, 4) if total else None,
+    }
+
+
+def reset_cache_stats():
+    cache.delete_many(list(STATS_KEYS.values()))
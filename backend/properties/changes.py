@@ -0,0 +1,45 @@
+"""Change log writes and reads for the incremental listings feed."""
+from django.db import transaction
+from django.db.models import Subquery
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import PropertyChange
+
+DEFAULT_CHANGES = 100
+MAX_CHANGES = 500
+
+
+def record_change(property_id, ref, active, changed_at=None):
+    """Log the current state of a property, replacing its previous entry."""
+    with transaction.atomic():
+        PropertyChange.objects.filter(property_id=property_id).delete()
+        PropertyChange.objects.create(
+            property_id=property_id,
+            ref=ref,
+            action=PropertyChange.UPSERT if active else PropertyChange.DELETE,
+            changed_at=changed_at or timezone.now(),
+        )
+
+
+def latest_change(field="changed_at"):
+    """Subquery for ``field`` of the most recent catalogue change, deletions included."""
+    return Subquery(PropertyChange.objects.order_by("-id").values(field)[:1])
+
+
+def parse_token(value):
+    """Feed position from a ``since`` token; an empty token replays from the start."""
+    if not value:
+        return 0
+    if not value.isdecimal():
+        raise ValidationError({"since": "Invalid token."})
+    return int(value)
+
+
+def read_changes(since, limit=DEFAULT_CHANGES):
+    """Up to ``limit`` log entries after ``since``, the next token and whether more remain."""
+    entries = list(PropertyChange.objects.filter(id__gt=since).order_by("id")[: limit + 1])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    token = entries[-1].id if entries else since
+    return entries, str(token), has_more
@@ -0,0 +1,81 @@
+import math
+
+from .cache import CatalogueMemo
+from .models import Property
+from .serializers import format_price
+
+MAX_CLUSTER_ZOOM = 16  # at and above this zoom every listing is a pin
+CLUSTER_CELL_PX = 60   # cluster grid size in screen pixels
+TILE_PX = 256
+COORD_DIGITS = 5
+
+
+def _mercator(lat, lng):
+    """Project to normalised Web Mercator coordinates in [0, 1)."""
+    x = (lng + 180.0) / 360.0
+    sin_lat = min(max(math.sin(math.radians(lat)), -0.9999), 0.9999)
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return x, y
+
+
+def build_map_index():
+    """Precompute clusters and pins for every zoom level of the active catalogue.
+
+    Returns ``{zoom: {"clusters": [[lat, lng, count], ...],
+    "pins": [[id, lat, lng, price], ...]}}``; cells holding a single
+    listing are emitted as pins rather than one-item clusters.
+    """
+    rows = (
+        Property.objects.filter(is_active=True)
+        .exclude(latitude=None).exclude(longitude=None)
+        .order_by("id")
+        .values_list("id", "latitude", "longitude", "price")
+    )
+    points = []
+    for pk, lat, lng, price in rows:
+        lat, lng = float(lat), float(lng)
+        points.append((pk, lat, lng, format_price(price), *_mercator(lat, lng)))
+
+    index = {}
+    for zoom in range(MAX_CLUSTER_ZOOM + 1):
+        if zoom == MAX_CLUSTER_ZOOM:
+            cells = {point[0]: [point] for point in points}
+        else:
+            scale = 2 ** zoom * TILE_PX / CLUSTER_CELL_PX
+            cells = {}
+            for point in points:
+                key = (int(point[4] * scale), int(point[5] * scale))
+                cells.setdefault(key, []).append(point)
+
+        clusters, pins = [], []
+        for members in cells.values():
+            if len(members) == 1:
+                pk, lat, lng, price = members[0][:4]
+                pins.append([pk, round(lat, COORD_DIGITS), round(lng, COORD_DIGITS), price])
+            else:
+                count = len(members)
+                clusters.append([
+                    round(sum(m[1] for m in members) / count, COORD_DIGITS),
+                    round(sum(m[2] for m in members) / count, COORD_DIGITS),
+                    count,
+                ])
+        index[zoom] = {"clusters": clusters, "pins": pins}
+    return index
+
+
+map_index = CatalogueMemo(build_map_index)
+
+
+def get_map_layer(zoom, bbox=None):
+    """Return the precomputed layer for ``zoom``, optionally cropped to a viewport.
+
+    ``bbox`` is ``(south, west, north, east)``.
+    """
+    layer = map_index.get()[min(max(zoom, 0), MAX_CLUSTER_ZOOM)]
+    if bbox is None:
+        return layer
+    south, west, north, east = bbox
+    return {
+        "clusters": [c for c in layer["clusters"] if south <= c[0] <= north and west <= c[1] <= east],
+        "pins": [p for p in layer["pins"] if south <= p[1] <= north and west <= p[2] <= east],
+    }
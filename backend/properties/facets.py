@@ -0,0 +1,118 @@
+from django.db.models import Case, Count, IntegerField, Q, Value, When
+
+from .filters import filter_properties
+from .models import PROPERTY_TYPE_CHOICES
+
+# Mirrors the price select on immobili.html; bounds are inclusive like
+# the price_min/price_max filters, so a bucket's count matches the
+# result count of selecting it.
+PRICE_BUCKETS = [
+    ("0-300000", 0, 300000),
+    ("300000-600000", 300000, 600000),
+    ("600000-1000000", 600000, 1000000),
+    ("1000000+", 1000000, None),
+]
+
+# Area histogram in m², half-open [min, max)
+AREA_BUCKETS = [
+    ("0-50", 0, 50),
+    ("50-100", 50, 100),
+    ("100-200", 100, 200),
+    ("200-400", 200, 400),
+    ("400+", 400, None),
+]
+
+
+def _price_q(low, high):
+    q = Q(price__gte=low)
+    if high is not None:
+        q &= Q(price__lte=high)
+    return q
+
+
+def _area_bucket():
+    return Case(
+        *[
+            When(area__lt=high, then=Value(index))
+            for index, (_, _, high) in enumerate(AREA_BUCKETS) if high is not None
+        ],
+        default=Value(len(AREA_BUCKETS) - 1),
+        output_field=IntegerField(),
+    )
+
+
+# Facets narrowed by their own filter params; each is counted without them
+FACET_PARAMS = {
+    "property_type": ("property_type",),
+    "location": ("location",),
+    "price": ("price_min", "price_max"),
+}
+
+
+def compute_facets(queryset, params):
+    """Facet counts for the Property ``queryset`` under the listing filters in ``params``.
+
+    A facet whose own filter is set is counted over the results of the
+    other filters only, so choosing one type or price range still shows
+    how many listings the alternatives would match.
+    """
+    facets = count_facets(filter_properties(queryset, params))
+    for facet, names in FACET_PARAMS.items():
+        if any(params.get(name) for name in names):
+            others = {key: value for key, value in params.items() if key not in names}
+            facets[facet] = count_facets(filter_properties(queryset, others))[facet]
+    return facets
+
+
+def count_facets(queryset):
+    """Facet counts for a filtered Property queryset in one grouped query.
+
+    Rows are grouped by (property_type, location, bedrooms, area bucket)
+    with one conditional count per price bucket, then rolled up per facet.
+    """
+    price_counts = {
+        f"price_{index}": Count("id", filter=_price_q(low, high))
+        for index, (_, low, high) in enumerate(PRICE_BUCKETS)
+    }
+    rows = (
+        queryset.order_by()
+        .annotate(area_bucket=_area_bucket())
+        .values("property_type", "location", "bedrooms", "area_bucket")
+        .annotate(total=Count("id"), **price_counts)
+    )
+
+    types, locations, bedrooms = {}, {}, {}
+    prices = [0] * len(PRICE_BUCKETS)
+    areas = [0] * len(AREA_BUCKETS)
+    total = 0
+    for row in rows:
+        count = row["total"]
+        total += count
+        types[row["property_type"]] = types.get(row["property_type"], 0) + count
+        locations[row["location"]] = locations.get(row["location"], 0) + count
+        bedrooms[row["bedrooms"]] = bedrooms.get(row["bedrooms"], 0) + count
+        areas[row["area_bucket"]] += count
+        for index in range(len(PRICE_BUCKETS)):
+            prices[index] += row[f"price_{index}"]
+
+    return {
+        "count": total,
+        "property_type": [
+            {"value": code, "label": label, "count": types.get(code, 0)}
+            for code, label in PROPERTY_TYPE_CHOICES
+        ],
+        "location": [
+            {"value": name, "count": count} for name, count in sorted(locations.items())
+        ],
+        "bedrooms": [
+            {"value": value, "count": count} for value, count in sorted(bedrooms.items())
+        ],
+        "price": [
+            {"value": value, "min": low, "max": high, "count": prices[index]}
+            for index, (value, low, high) in enumerate(PRICE_BUCKETS)
+        ],
+        "area": [
+            {"value": value, "min": low, "max": high, "count": areas[index]}
+            for index, (value, low, high) in enumerate(AREA_BUCKETS)
+        ],
+    }
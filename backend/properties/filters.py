@@ -0,0 +1,159 @@
+import math
+from decimal import Decimal, InvalidOperation
+from functools import reduce
+from operator import or_
+
+from django.db.models import FloatField, Q
+from django.db.models.functions import Cast, Cos, Radians, Sin
+from rest_framework.exceptions import ValidationError
+
+from .geo import EARTH_RADIUS_KM, covering_cells, radius_bbox
+from .locations import location_trie
+from .search import search_properties
+
+DEFAULT_SORT = "most_recent"
+RELEVANCE_SORT = "relevance"
+
+# Largest ``radius_km`` accepted with ``near=``
+MAX_RADIUS_KM = 100
+
+SORT_MAPPING = {
+    "most_recent": "-created_at",
+    "price_asc": "price",
+    "price_desc": "-price",
+    "area_asc": "area",
+    "area_desc": "-area",
+}
+
+
+def get_ordering(params, allow_relevance=True):
+    """Return the order_by expression for the requested sort key.
+
+    Full-text searches (``q=``) are ranked by relevance unless an explicit
+    sort is requested; keyset pagination passes ``allow_relevance=False``
+    because BM25 scores are not stable cursor positions.
+    """
+    sort = params.get("sort")
+    if allow_relevance and params.get("q") and sort in (None, "", RELEVANCE_SORT):
+        return "search_rank"
+    return SORT_MAPPING.get(sort or DEFAULT_SORT, SORT_MAPPING[DEFAULT_SORT])
+
+
+def parse_floats(value, count, name):
+    try:
+        numbers = [float(part) for part in value.split(",")]
+    except ValueError:
+        numbers = []
+    if len(numbers) != count or not all(math.isfinite(number) for number in numbers):
+        raise ValidationError({name: f"Expected {count} comma-separated numbers."})
+    return numbers
+
+
+def parse_bbox(value):
+    """``(south, west, north, east)`` from a ``west,south,east,north`` param (GeoJSON order)."""
+    west, south, east, north = parse_floats(value, 4, "bbox")
+    if not (-90 <= south <= north <= 90 and -180 <= west <= east <= 180):
+        raise ValidationError({"bbox": "Expected west <= east within [-180, 180] and south <= north within [-90, 90]."})
+    return south, west, north, east
+
+
+def parse_near(params):
+    """``(lat, lng, radius_km)`` from ``near=lat,lng`` and ``radius_km`` (default 10, at most 100)."""
+    lat, lng = parse_floats(params["near"], 2, "near")
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValidationError({"near": "Expected a latitude within [-90, 90] and a longitude within [-180, 180]."})
+    radius_km = parse_floats(params.get("radius_km") or "10", 1, "radius_km")[0]
+    if radius_km <= 0:
+        raise ValidationError({"radius_km": "Expected a positive number."})
+    if radius_km > MAX_RADIUS_KM:
+        raise ValidationError({"radius_km": f"Expected at most {MAX_RADIUS_KM}."})
+    return lat, lng, radius_km
+
+
+def parse_decimal(value, name):
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        number = None
+    if number is None or not number.is_finite():
+        raise ValidationError({name: "Expected a number."})
+    return number
+
+
+def filter_bbox(queryset, south, west, north, east):
+    """Restrict to coordinates inside a box, using the geohash index for candidates."""
+    cells = covering_cells(south, west, north, east)
+    if not cells:
+        return queryset.none()
+    # Each covering prefix is an index range scan: prefix <= geohash < prefix + "~"
+    in_cells = reduce(or_, (Q(geohash__gte=cell, geohash__lt=cell + "~") for cell in cells))
+    return queryset.filter(
+        in_cells,
+        latitude__gte=south, latitude__lte=north,
+        longitude__gte=west, longitude__lte=east,
+    )
+
+
+def haversine_term(lat, lng):
+    """SQL haversine ``a`` term between each listing's coordinates and a point."""
+    latitude = Radians(Cast("latitude", FloatField()))
+    longitude = Radians(Cast("longitude", FloatField()))
+    half_dlat = Sin((latitude - math.radians(lat)) / 2)
+    half_dlng = Sin((longitude - math.radians(lng)) / 2)
+    return half_dlat * half_dlat + math.cos(math.radians(lat)) * Cos(latitude) * half_dlng * half_dlng
+
+
+def filter_radius(queryset, lat, lng, radius_km):
+    """Restrict to coordinates within ``radius_km``; haversine runs on index candidates only."""
+    candidates = filter_bbox(queryset, *radius_bbox(lat, lng, radius_km))
+    # distance <= radius  <=>  a <= sin²(radius / 2R), so no asin/sqrt per row
+    limit = math.sin(radius_km / (2 * EARTH_RADIUS_KM)) ** 2
+    return candidates.alias(near_term=haversine_term(lat, lng)).filter(near_term__lte=limit)
+
+
+def filter_properties(queryset, params):
+    """Apply the public listing filters from query params to a Property queryset."""
+    # Full-text search
+    q = (params.get("q") or "").strip()
+    if q:
+        queryset = search_properties(queryset, q, params.get("lang", "it"))
+
+    # Location filter: accent/case-insensitive substring of the folded
+    # location, resolved in memory to an indexed IN on location_key
+    location = params.get("location")
+    if location:
+        queryset = queryset.filter(location_key__in=location_trie.get().matching_keys(location))
+
+    # Price range filter
+    price_min = params.get("price_min")
+    price_max = params.get("price_max")
+    if price_min:
+        queryset = queryset.filter(price__gte=parse_decimal(price_min, "price_min"))
+    if price_max:
+        queryset = queryset.filter(price__lte=parse_decimal(price_max, "price_max"))
+
+    # Property type filter
+    property_type = params.get("property_type")
+    if property_type:
+        queryset = queryset.filter(property_type=property_type)
+
+    # Map viewport: bbox=west,south,east,north (GeoJSON order)
+    bbox = params.get("bbox")
+    if bbox:
+        queryset = filter_bbox(queryset, *parse_bbox(bbox))
+
+    # Radius search: near=lat,lng&radius_km=
+    if params.get("near"):
+        queryset = filter_radius(queryset, *parse_near(params))
+
+    return queryset
+
+
+def listing_queryset(queryset, params):
+    """Filter and order a Property queryset exactly as the list API does.
+
+    ``id`` breaks ties in the sort direction, like the (column, id) indexes.
+    """
+    queryset = filter_properties(queryset, params)
+    ordering = get_ordering(params)
+    return queryset.order_by(ordering, "-id" if ordering.startswith("-") else "id")
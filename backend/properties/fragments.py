@@ -0,0 +1,156 @@
+"""Server-rendered HTML for property cards and detail pages.
+
+Fragments are cached per (kind, property, language) under keys that do
+not depend on the catalogue version, so editing one listing only
+re-renders that listing. Keys carry a stamp of the row state (card:
+``updated_at``; detail: also its change-log entry, which gallery edits
+renew), so no worker can serve a fragment rendered before the last change.
+They also carry a stamp of the template file and locale bundle, so editing
+either renders fresh fragments.
+"""
+import hashlib
+import os
+
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+from django.template.loader import get_template, render_to_string
+from django.utils.safestring import mark_safe
+
+from translations.bundles import get_bundle
+
+from .cache import RESPONSE_CACHE_TIMEOUT
+from .models import Property, PropertyChange
+
+CARD_TEMPLATES = {
+    "listing": "includes/property-card.html",
+    "home": "includes/home-property-card.html",
+}
+DETAIL_TEMPLATE = "includes/property-detail-content.html"
+FRAGMENT_TEMPLATES = {**CARD_TEMPLATES, "detail": DETAIL_TEMPLATE}
+
+DETAIL_ICONS = "gardablick/images/details/details-icons/"
+
+# (payload key, translation key, icon) in the order the detail page lists them
+CHARACTERISTICS = (
+    ("ref", "details.reference", None),
+    ("commercial_area", "details.commercialArea", "Metri quadri commerciali.png"),
+    ("net_area", "details.netArea", "Metri quadri netti.png"),
+    ("bedrooms", "details.bedrooms", "Camere.png"),
+    ("bathrooms", "details.bathrooms", "Bagni.png"),
+    ("total_rooms", "details.rooms", "Locali.png"),
+    ("energy_class", "details.energyClass", "Classe energetica.png"),
+    ("condominium_fees", "details.condominiumFees", "Spese condominiali.png"),
+)
+
+# Thumbnails shown next to the main image; the rest open in the lightbox
+MAX_THUMBNAILS = 4
+
+
+def fragment_version(template, lang):
+    """Short stamp of ``template``'s source file and the ``lang`` bundle; one stat each."""
+    stat = os.stat(get_template(template).origin.name)
+    bundle = get_bundle(lang)
+    raw = f"{stat.st_mtime_ns}:{stat.st_size}:{bundle.stamp if bundle is not None else ''}"
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def fragment_key(kind, pk, lang, stamp, version=None):
+    """Cache key of a fragment; ``stamp`` identifies the row state it renders."""
+    if version is None:
+        version = fragment_version(FRAGMENT_TEMPLATES[kind], lang)
+    return f"properties:fragment:{kind}:{pk}:{stamp}:{lang}:{version}"
+
+
+def render_cards(cards, lang, kind="listing"):
+    """HTML for list ``cards`` (list payload items plus ``updated_at``), reusing cached fragments."""
+    version = fragment_version(CARD_TEMPLATES[kind], lang)
+    keys = [
+        fragment_key(kind, card["id"], lang, card["updated_at"].timestamp(), version)
+        for card in cards
+    ]
+    cached = cache.get_many(keys)
+    fresh = {}
+    for key, card in zip(keys, cards):
+        if key not in cached:
+            fresh[key] = render_to_string(CARD_TEMPLATES[kind], {"card": card, "lang": lang})
+    if fresh:
+        cache.set_many(fresh, RESPONSE_CACHE_TIMEOUT)
+    return mark_safe("".join(cached.get(key) or fresh[key] for key in keys))
+
+
+def translate(key, lang):
+    """The locale bundle's text for a dotted ``key``, or the key itself."""
+    bundle = get_bundle(lang)
+    value = bundle.data if bundle is not None else {}
+    for part in key.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return key
+        value = value[part]
+    return value
+
+
+def render_detail(prop, lang):
+    """``{"html", "title", "ref", "images"}`` for a detail payload ``prop``."""
+    images = [url for url in [prop["main_image"], *prop["gallery_images"]] if url]
+    thumbnails = [
+        {"src": src, "index": index}
+        for index, src in enumerate(images[1:MAX_THUMBNAILS + 1], start=1)
+    ]
+    composition = prop["composition"] or []
+    if isinstance(composition, str):
+        composition = [line for line in composition.split("\n") if line.strip()]
+    characteristics = [
+        {
+            "key": i18n_key,
+            "label": translate(i18n_key, lang),
+            "value": prop[name],
+            "icon": icon and DETAIL_ICONS + icon,
+        }
+        for name, i18n_key, icon in CHARACTERISTICS
+        if prop[name] not in (None, "")
+    ]
+    html = render_to_string(DETAIL_TEMPLATE, {
+        "prop": prop,
+        "lang": lang,
+        "main_image": images[0] if images else "",
+        "thumbnails": thumbnails,
+        "more_photos": max(len(images) - MAX_THUMBNAILS - 1, 0),
+        "composition": composition,
+        "characteristics": characteristics,
+    })
+    return {"html": html, "title": prop["title"], "ref": prop["ref"], "images": images}
+
+
+def detail_stamp(pk):
+    """Row state of ``pk`` for its detail key, or None if it is not an active listing."""
+    change = PropertyChange.objects.filter(property_id=OuterRef("pk")).values("id")[:1]
+    row = (
+        Property.objects.filter(pk=pk, is_active=True)
+        .annotate(change=Subquery(change))
+        .values_list("updated_at", "change")
+        .first()
+    )
+    if row is None:
+        return None
+    return f"{row[0].timestamp()}-{row[1]}"
+
+
+def cached_detail(pk, lang, build):
+    """The rendered detail of ``pk`` in ``lang``, or None if it is not an active listing.
+
+    ``build`` returns the detail payload (or None) and only runs on a miss.
+    Activity is checked on every call, so a cached fragment is never served
+    for a listing deactivated since it was rendered.
+    """
+    stamp = detail_stamp(pk)
+    if stamp is None:
+        return None
+    key = fragment_key("detail", pk, lang, stamp)
+    detail = cache.get(key)
+    if detail is None:
+        prop = build()
+        if prop is None:
+            return None
+        detail = render_detail(prop, lang)
+        cache.set(key, detail, RESPONSE_CACHE_TIMEOUT)
+    return detail
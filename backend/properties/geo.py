@@ -0,0 +1,83 @@
+import math
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 6  # cells of roughly 1.2km x 0.6km
+EARTH_RADIUS_KM = 6371.0088
+MAX_COVERING_CELLS = 32
+
+
+def encode_geohash(lat, lng, precision=GEOHASH_PRECISION):
+    """Encode a coordinate as a base-32 geohash string."""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def geohash_for(latitude, longitude):
+    """Geohash for nullable model coordinates ("" when either is missing)."""
+    if latitude is None or longitude is None:
+        return ""
+    return encode_geohash(float(latitude), float(longitude))
+
+
+def cell_size(precision):
+    """(height, width) in degrees of a geohash cell at ``precision``."""
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def covering_cells(south, west, north, east, max_cells=MAX_COVERING_CELLS):
+    """Return the geohash prefixes covering a bounding box.
+
+    The finest precision that needs at most ``max_cells`` prefixes is used,
+    so the candidate query stays a handful of index range scans.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        lat_start = math.floor((south + 90) / height) * height - 90
+        lng_start = math.floor((west + 180) / width) * width - 180
+        rows = math.floor((north - lat_start) / height) + 1
+        cols = math.floor((east - lng_start) / width) + 1
+        if rows * cols <= max_cells or precision == 1:
+            break
+    cells = set()
+    for row in range(rows):
+        lat = min(lat_start + (row + 0.5) * height, 90.0)
+        for col in range(cols):
+            lng = min(lng_start + (col + 0.5) * width, 180.0)
+            cells.add(encode_geohash(lat, lng, precision))
+    return sorted(cells)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def radius_bbox(lat, lng, radius_km):
+    """(south, west, north, east) box enclosing a circle around a point."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    dlng = dlat / max(math.cos(math.radians(lat)), 1e-6)
+    return (
+        max(lat - dlat, -90.0), max(lng - dlng, -180.0),
+        min(lat + dlat, 90.0), min(lng + dlng, 180.0),
+    )
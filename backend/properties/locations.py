@@ -0,0 +1,91 @@
+"""Accent- and case-folded location keys and the autocomplete prefix trie.
+
+``Property.location_key`` stores ``fold_location(location)`` so the list
+filter can match "salo" to "Salò" with an indexed ``IN`` lookup; the trie
+of distinct locations (with counts) is rebuilt per catalogue version.
+"""
+import unicodedata
+
+from django.db.models import Count
+
+from .cache import CatalogueMemo
+
+MAX_SUGGESTIONS = 10
+
+
+def fold_location(value):
+    """Lowercase, strip accents and collapse whitespace: "  Salò " -> "salo"."""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+class LocationTrie:
+    """Prefix trie over folded location names and each of their words.
+
+    Every node keeps its best MAX_SUGGESTIONS locations (by count, then
+    name), so a lookup is one walk down the typed prefix.
+    """
+
+    def __init__(self, locations):
+        # locations: [(location, location_key, count)]
+        merged = {}
+        for location, key, count in locations:
+            entry = merged.setdefault(key, {"location": location, "count": 0, "names": {}})
+            entry["count"] += count
+            entry["names"][location] = entry["names"].get(location, 0) + count
+        self.keys = {}
+        for key, entry in merged.items():
+            # The most common spelling represents the folded key
+            name = max(entry["names"].items(), key=lambda item: (item[1], item[0]))[0]
+            self.keys[key] = {"location": name, "count": entry["count"]}
+
+        ranked = sorted(self.keys.items(), key=lambda item: (-item[1]["count"], item[1]["location"]))
+        self.root = {"children": {}, "suggestions": []}
+        for key, suggestion in ranked:
+            words = key.split(" ")
+            starts = {" ".join(words[index:]) for index in range(len(words))}
+            for start in starts:
+                self._insert(start, suggestion)
+
+    def _insert(self, text, suggestion):
+        node = self.root
+        self._suggest(node, suggestion)
+        for char in text:
+            node = node["children"].setdefault(char, {"children": {}, "suggestions": []})
+            self._suggest(node, suggestion)
+
+    @staticmethod
+    def _suggest(node, suggestion):
+        # Insertion runs in rank order, so the first MAX_SUGGESTIONS are the best
+        suggestions = node["suggestions"]
+        if len(suggestions) < MAX_SUGGESTIONS and suggestion not in suggestions:
+            suggestions.append(suggestion)
+
+    def suggest(self, prefix, limit=MAX_SUGGESTIONS):
+        node = self.root
+        for char in fold_location(prefix):
+            node = node["children"].get(char)
+            if node is None:
+                return []
+        return node["suggestions"][:limit]
+
+    def matching_keys(self, text):
+        """Folded keys containing ``text``; the location filter's IN list."""
+        needle = fold_location(text)
+        return [key for key in self.keys if needle in key]
+
+
+def build_location_trie():
+    from .models import Property
+
+    rows = (
+        Property.objects.filter(is_active=True)
+        .order_by()
+        .values_list("location", "location_key")
+        .annotate(count=Count("id"))
+    )
+    return LocationTrie(list(rows))
+
+
+location_trie = CatalogueMemo(build_location_trie)
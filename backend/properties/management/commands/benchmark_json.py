@@ -0,0 +1,87 @@
+import json
+import time
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from config.renderers import FastJSONRenderer, orjson
+from properties.management.commands.seed_properties import PROPERTIES_DATA
+from properties.row_serializers import detail_fields, list_fields, serialize_rows
+
+
+def seed_rows():
+    """Detail-shaped rows built from the seed_properties catalogue, no database needed."""
+    rows = []
+    for index, data in enumerate(PROPERTIES_DATA, start=1):
+        rows.append({
+            "id": index,
+            "title": data["title"],
+            "location": data["location"],
+            "price": data["price"],
+            "ref": data["ref"],
+            "area": data["area"],
+            "commercial_area": data.get("commercial_area"),
+            "net_area": data.get("net_area"),
+            "bedrooms": data["bedrooms"],
+            "bathrooms": data["bathrooms"],
+            "total_rooms": data.get("total_rooms"),
+            "energy_class": data.get("energy_class", ""),
+            "condominium_fees": data.get("condominium_fees"),
+            "description": data.get("description", {}),
+            "composition": data.get("composition", {}),
+            "composition_note": data.get("composition_note", {}),
+            "location_note": data.get("location_note", {}),
+            "main_image": f"properties/main/property_{index}.png",
+            "latitude": data.get("latitude"),
+            "longitude": data.get("longitude"),
+        })
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Compare DRF's JSONRenderer with FastJSONRenderer on payloads built from seed_properties data"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=2000)
+        parser.add_argument("--lang", default="de")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson is not installed; FastJSONRenderer uses the stdlib fallback."))
+
+        rows = seed_rows()
+        lang = options["lang"]
+        cards = serialize_rows(rows, list_fields(lang))
+        details = serialize_rows(rows, detail_fields(lang, {}))
+        now = datetime.now(timezone.utc)
+
+        def page(size):
+            results = (cards * (size // len(cards) + 1))[:size]
+            return {"count": 500, "next": "http://testserver/api/properties/?page=2", "previous": None, "results": results}
+
+        payloads = {
+            "list page (9)": page(9),
+            "list page (50)": page(50),
+            "detail": details[0],
+            "raw rows (Decimal/datetime)": [dict(row, updated_at=now) for row in rows],
+        }
+
+        drf, fast = JSONRenderer(), FastJSONRenderer()
+        for name, payload in payloads.items():
+            expected, actual = drf.render(payload), fast.render(payload)
+            if json.loads(expected) != json.loads(actual):
+                raise CommandError(f"Renderers disagree on {name}")
+            drf_us = self.time(lambda: drf.render(payload), options["repeat"])
+            fast_us = self.time(lambda: fast.render(payload), options["repeat"])
+            self.stdout.write(
+                f"{name:<28} {len(expected):>7} bytes  json {drf_us:9.2f}µs  "
+                f"fast {fast_us:9.2f}µs  ({drf_us / fast_us:.1f}x)"
+            )
+
+    @staticmethod
+    def time(func, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) * 1_000_000 / repeat
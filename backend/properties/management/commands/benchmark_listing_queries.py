@@ -0,0 +1,139 @@
+import itertools
+import random
+import re
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from properties.filters import RELEVANCE_SORT, SORT_MAPPING, listing_queryset
+from properties.geo import geohash_for
+from properties.locations import fold_location
+from properties.models import PROPERTY_TYPE_CHOICES, Property
+from properties.views import LIST_FIELDS, PropertyViewSet
+
+
+LOCATIONS = [
+    "Salò", "Desenzano del Garda", "Sirmione", "Manerba del Garda",
+    "Polpenazze del Garda", "Padenghe sul Garda", "Gardone Riviera", "Toscolano-Maderno",
+]
+
+# Synthetic coordinates are spread over this box around the lake
+AREA = {"south": 45.40, "west": 10.45, "north": 45.80, "east": 10.75}
+
+FILTER_VARIANTS = {
+    "q": [None, "villa"],
+    "location": [None, "Salò"],
+    "property_type": [None, "villa"],
+    "price": [(None, None), ("500000", None), (None, "1000000"), ("500000", "1000000")],
+    "geo": [{}, {"bbox": "10.50,45.50,10.60,45.60"}, {"near": "45.60,10.55", "radius_km": "5"}],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic catalogue inside a rolled-back transaction and print "
+        "EXPLAIN QUERY PLAN plus timings for every listing filter/sort combination"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=20000, help="Synthetic properties to create")
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query")
+        parser.add_argument("--page-size", type=int, default=9)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options["count"])
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+            full_scans = self.run(options["repeat"], options["page_size"])
+            transaction.set_rollback(True)
+
+        if full_scans:
+            self.stdout.write(self.style.ERROR(f"{full_scans} query path(s) do a full table scan."))
+        else:
+            self.stdout.write(self.style.SUCCESS("No query path does a full table scan."))
+
+    def seed(self, count):
+        rng = random.Random(42)
+        types = [code for code, _ in PROPERTY_TYPE_CHOICES]
+        batch = []
+        for i, location in enumerate(rng.choice(LOCATIONS) for _ in range(count)):
+            property_type = rng.choice(types)
+            latitude = Decimal(f"{rng.uniform(AREA['south'], AREA['north']):.6f}")
+            longitude = Decimal(f"{rng.uniform(AREA['west'], AREA['east']):.6f}")
+            batch.append(Property(
+                title={
+                    "it": f"{property_type} {location} {i}",
+                    "en": f"{property_type} {location} {i}",
+                    "de": f"{property_type} {location} {i}",
+                },
+                location=location,
+                location_key=fold_location(location),
+                price=Decimal(rng.randrange(80, 5000) * 1000),
+                ref=f"BENCH-{i:06d}",
+                area=Decimal(rng.randrange(30, 800)),
+                bedrooms=rng.randrange(0, 8),
+                bathrooms=rng.randrange(0, 6),
+                property_type=property_type,
+                main_image="properties/main/bench.png",
+                is_active=rng.random() > 0.1,
+                latitude=latitude,
+                longitude=longitude,
+                # bulk_create skips save(), which normally derives the geohash
+                geohash=geohash_for(latitude, longitude),
+            ))
+        start = time.perf_counter()
+        Property.objects.bulk_create(batch, batch_size=1000)
+        self.stdout.write(f"Seeded {count} properties in {time.perf_counter() - start:.2f}s\n")
+
+    def run(self, repeat, page_size):
+        full_scans = 0
+        # The FTS table shares the prefix, so match the listing table name only
+        table_scan = re.compile(rf"SCAN {Property._meta.db_table}\b")
+        combos = itertools.product(
+            FILTER_VARIANTS["q"], FILTER_VARIANTS["location"], FILTER_VARIANTS["property_type"],
+            FILTER_VARIANTS["price"], FILTER_VARIANTS["geo"],
+        )
+        for q, location, property_type, (price_min, price_max), geo in combos:
+            sorts = [*SORT_MAPPING, RELEVANCE_SORT] if q else SORT_MAPPING
+            for sort in sorts:
+                params = {
+                    "q": q, "sort": sort, "location": location, "property_type": property_type,
+                    "price_min": price_min, "price_max": price_max, **geo,
+                }
+                params = {key: value for key, value in params.items() if value}
+                full_scans += self.report(params, repeat, page_size, table_scan)
+        return full_scans
+
+    def report(self, params, repeat, page_size, table_scan):
+        """Explain and time one combination through the list API's queryset path."""
+        def build():
+            return listing_queryset(PropertyViewSet.queryset.all(), params)
+
+        queryset = build()
+        extra = ["search_rank"] if "search_rank" in queryset.query.annotations else []
+        plan = queryset.values(*LIST_FIELDS, *extra)[:page_size].explain()
+        scans_table = any(
+            table_scan.search(line) and "USING" not in line for line in plan.splitlines()
+        )
+
+        # Rebuild per run so filters that query while building are timed too
+        page_ms = self.time(lambda: list(build().values(*LIST_FIELDS, *extra)[:page_size]), repeat)
+        count_ms = self.time(lambda: build().order_by().count(), repeat)
+
+        label = " ".join(f"{key}={value}" for key, value in params.items())
+        style = self.style.ERROR if scans_table else self.style.SUCCESS
+        self.stdout.write(style(label))
+        self.stdout.write(f"  page {page_ms:.3f}ms  count {count_ms:.3f}ms")
+        for line in plan.splitlines():
+            self.stdout.write(f"    {line}")
+        return scans_table
+
+    @staticmethod
+    def time(func, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) * 1000 / repeat
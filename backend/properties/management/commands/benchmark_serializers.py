@@ -0,0 +1,82 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from properties.models import Property
+from properties.row_serializers import LIST_COLUMNS, list_fields, serialize_rows
+from properties.serializers import PropertyListSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-object cost of PropertyListSerializer and the values()-row "
+        "serializer at several page sizes, on a synthetic catalogue that is rolled back"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="9,50,10000", help="Comma-separated page sizes")
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--lang", default="en")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",")]
+        with transaction.atomic():
+            self.seed(max(sizes))
+            for size in sizes:
+                self.compare(size, options["repeat"], options["lang"])
+            transaction.set_rollback(True)
+
+    def seed(self, count):
+        rng = random.Random(7)
+        Property.objects.bulk_create(
+            [
+                Property(
+                    title={"it": f"Villa con vista lago {i}", "en": f"Lake view villa {i}", "de": ""},
+                    location="Salò",
+                    price=Decimal(rng.randrange(80, 5000) * 1000),
+                    ref=f"BENCH-{i:06d}",
+                    area=Decimal(rng.randrange(3000, 80000)) / 100,
+                    bedrooms=rng.randrange(0, 8),
+                    bathrooms=rng.randrange(0, 6),
+                    main_image=f"properties/main/bench_{i}.png",
+                )
+                for i in range(count)
+            ],
+            batch_size=1000,
+        )
+
+    def compare(self, size, repeat, lang):
+        queryset = Property.objects.order_by("id")[:size]
+        objects = list(queryset)
+        rows = list(queryset.values(*LIST_COLUMNS))
+        request = Request(RequestFactory().get("/", {"lang": lang}))
+        renderer = JSONRenderer()
+
+        def drf():
+            return renderer.render(PropertyListSerializer(objects, many=True, context={"request": request}).data)
+
+        def plain():
+            return renderer.render(serialize_rows(rows, list_fields(lang)))
+
+        if drf() != plain():
+            raise CommandError(f"Output differs at page size {size}")
+
+        drf_us = self.time(drf, repeat) / size
+        plain_us = self.time(plain, repeat) / size
+        self.stdout.write(
+            f"page size {size:>6}: serializer {drf_us:8.2f}µs/obj  "
+            f"rows {plain_us:8.2f}µs/obj  ({drf_us / plain_us:.1f}x)"
+        )
+
+    @staticmethod
+    def time(func, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) * 1_000_000 / repeat
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from properties.cache import bump_catalogue_version
+from properties.models import Property
+from properties.projections import rebuild_list_cards
+
+
+class Command(BaseCommand):
+    help = "Rebuild the precomputed per-language list cards of every property"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        updated = rebuild_list_cards(Property.objects.order_by("id"), options["batch_size"])
+        bump_catalogue_version()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt list cards for {updated} properties."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from properties.similar import rebuild_similar
+
+
+class Command(BaseCommand):
+    help = "Recompute and store the similar listings of every active property"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        updated = rebuild_similar(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Stored similar listings for {updated} properties."))
@@ -0,0 +1,144 @@
+"""Price-per-m² market statistics for the active catalogue.
+
+The base columns (price per m², location and type codes) are loaded into
+NumPy arrays once per catalogue version; each ``group_by`` is then one
+sort plus vectorized quantile interpolation over the group boundaries, and
+its result is cached against the catalogue version. Without NumPy the same
+statistics are computed from the rows in plain Python.
+"""
+from django.core.cache import cache
+from rest_framework.exceptions import ValidationError
+
+from .cache import RESPONSE_CACHE_TIMEOUT, CatalogueMemo, get_catalogue_version
+from .models import Property
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+GROUP_FIELDS = ("location", "property_type")
+QUARTILES = {"q1": 0.25, "median": 0.5, "q3": 0.75}
+
+
+def _interpolate(values, q):
+    """Linearly interpolated quantile ``q`` of sorted ``values`` (NumPy's default method)."""
+    position = q * (len(values) - 1)
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+class MarketRows:
+    """Pure-Python fallback over ``(price_per_m2, location, property_type)`` rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def aggregate(self, group_by):
+        """Count, min, quartiles and max of price per m² for each group."""
+        indexes = [GROUP_FIELDS.index(field) + 1 for field in group_by]
+        groups = {}
+        for row in self.rows:
+            groups.setdefault(tuple(row[index] for index in indexes), []).append(row[0])
+
+        result = []
+        for key in sorted(groups):
+            values = sorted(groups[key])
+            stats = {"min": values[0], "max": values[-1]}
+            stats.update((name, _interpolate(values, q)) for name, q in QUARTILES.items())
+            group = dict(zip(group_by, key))
+            group["count"] = len(values)
+            group["price_per_m2"] = {
+                name: round(stats[name], 2) for name in ("min", "q1", "median", "q3", "max")
+            }
+            result.append(group)
+        result.sort(key=lambda group: -group["count"])
+        return result
+
+
+class MarketArrays:
+    """Price per m² and group codes as NumPy arrays."""
+
+    def __init__(self, rows):
+        self.price_per_m2 = np.array([row[0] for row in rows], dtype=np.float64)
+        self.labels, self.codes = {}, {}
+        for index, field in enumerate(GROUP_FIELDS, start=1):
+            labels, codes = np.unique([row[index] for row in rows], return_inverse=True)
+            self.labels[field] = labels.tolist()
+            self.codes[field] = codes.reshape(-1).astype(np.int64)
+
+    def aggregate(self, group_by):
+        """Count, min, quartiles and max of price per m² for each group."""
+        values = self.price_per_m2
+        if not len(values):
+            return []
+
+        # One integer key per row combining the codes of every grouping field
+        key = np.zeros(len(values), dtype=np.int64)
+        for field in group_by:
+            key = key * len(self.labels[field]) + self.codes[field]
+
+        order = np.lexsort((values, key))
+        keys, values = key[order], values[order]
+        group_keys, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+        ends = starts + counts - 1
+
+        stats = {"min": values[starts], "max": values[ends]}
+        for name, q in QUARTILES.items():
+            position = starts + q * (counts - 1)
+            low = np.floor(position).astype(np.int64)
+            high = np.ceil(position).astype(np.int64)
+            stats[name] = values[low] + (values[high] - values[low]) * (position - low)
+
+        groups = []
+        for index, group_key in enumerate(group_keys.tolist()):
+            group = {}
+            for field in reversed(group_by):
+                size = len(self.labels[field])
+                group[field] = self.labels[field][group_key % size]
+                group_key //= size
+            group = {field: group[field] for field in group_by}
+            group["count"] = int(counts[index])
+            group["price_per_m2"] = {
+                name: round(float(stats[name][index]), 2)
+                for name in ("min", "q1", "median", "q3", "max")
+            }
+            groups.append(group)
+        groups.sort(key=lambda group: -group["count"])
+        return groups
+
+
+def build_market_data():
+    """Price per m² and group labels of every active listing with a usable area."""
+    queryset = Property.objects.filter(is_active=True).order_by()
+    rows = []
+    for price, area, commercial_area, *labels in queryset.values_list(
+        "price", "area", "commercial_area", *GROUP_FIELDS,
+    ):
+        # commercial_area is the figure agencies quote the price against; area otherwise
+        surface = commercial_area or area
+        if surface and surface > 0:
+            rows.append((float(price) / float(surface), *labels))
+    return MarketArrays(rows) if np is not None else MarketRows(rows)
+
+
+market_data = CatalogueMemo(build_market_data)
+
+
+def parse_group_by(value):
+    group_by = tuple(dict.fromkeys(part.strip() for part in (value or "").split(",") if part.strip()))
+    unknown = [field for field in group_by if field not in GROUP_FIELDS]
+    if unknown:
+        raise ValidationError({"group_by": f"Unknown field(s): {', '.join(unknown)}. Use {', '.join(GROUP_FIELDS)}."})
+    return group_by
+
+
+def get_market_stats(group_by):
+    """Stats payload for ``group_by``, computed once per catalogue version."""
+    key = f"properties:market:{get_catalogue_version()}:{','.join(group_by)}"
+    data = cache.get(key)
+    if data is None:
+        data = {"group_by": list(group_by), "groups": market_data.get().aggregate(group_by)}
+        cache.set(key, data, RESPONSE_CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,63 @@
+from django.db import migrations
+
+
+FTS_TABLE = "properties_property_fts"
+
+# Keep in sync with properties.search.SEARCH_COLUMNS
+COLUMNS = [
+    ("location", "new.location"),
+] + [
+    (f"{field}_{lang}", f"json_extract(new.{field}, '$.{lang}')")
+    for lang in ("it", "en", "de")
+    for field in ("title", "description", "composition")
+]
+
+INSERT_ROW = "INSERT INTO {table}(rowid, {columns}) VALUES (new.id, {values});".format(
+    table=FTS_TABLE,
+    columns=", ".join(name for name, _ in COLUMNS),
+    values=", ".join(expr for _, expr in COLUMNS),
+)
+DELETE_ROW = f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id;"
+
+FORWARD_SQL = [
+    "CREATE VIRTUAL TABLE {table} USING fts5({columns}, tokenize = 'unicode61 remove_diacritics 2');".format(
+        table=FTS_TABLE, columns=", ".join(name for name, _ in COLUMNS),
+    ),
+    f"CREATE TRIGGER properties_property_fts_ai AFTER INSERT ON properties_property BEGIN {INSERT_ROW} END;",
+    f"CREATE TRIGGER properties_property_fts_ad AFTER DELETE ON properties_property BEGIN {DELETE_ROW} END;",
+    "CREATE TRIGGER properties_property_fts_au AFTER UPDATE OF location, title, description, composition "
+    f"ON properties_property BEGIN {DELETE_ROW} {INSERT_ROW} END;",
+    "INSERT INTO {table}(rowid, {columns}) SELECT id, {values} FROM properties_property;".format(
+        table=FTS_TABLE,
+        columns=", ".join(name for name, _ in COLUMNS),
+        values=", ".join(expr.replace("new.", "") for _, expr in COLUMNS),
+    ),
+]
+
+REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS properties_property_fts_au;",
+    "DROP TRIGGER IF EXISTS properties_property_fts_ad;",
+    "DROP TRIGGER IF EXISTS properties_property_fts_ai;",
+    f"DROP TABLE IF EXISTS {FTS_TABLE};",
+]
+
+
+def run_sql(statements):
+    def run(apps, schema_editor):
+        # FTS5 is SQLite-only; other backends use the icontains fallback
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0003_property_listing_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sql(FORWARD_SQL), run_sql(REVERSE_SQL)),
+    ]
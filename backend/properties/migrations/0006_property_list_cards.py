@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:33
+
+from django.db import migrations, models
+
+# Frozen copy of properties.projections.build_list_cards as of this
+# migration: the list serializer output for each language, minus ``id``.
+# Later card changes are picked up by ``manage.py rebuild_list_cards``.
+LANGUAGES = ["it", "en", "de"]
+
+
+def _trim(value):
+    return int(value) if value == int(value) else value
+
+
+def build_list_cards(prop, image_url):
+    cards = {}
+    for lang in LANGUAGES:
+        title = prop.title
+        if isinstance(title, dict):
+            title = title.get(lang) or title.get("it", "")
+        cards[lang] = {
+            "image": image_url,
+            "title": title,
+            "price": f"{int(prop.price):,}".replace(",", ".") + "€",
+            "location": prop.location,
+            "ref": prop.ref,
+            "area": f"{_trim(prop.area)}m²",
+            "bedrooms": prop.bedrooms,
+            "bathrooms": prop.bathrooms,
+        }
+    return cards
+
+
+def backfill_list_cards(apps, schema_editor):
+    Property = apps.get_model("properties", "Property")
+    batch = []
+    for prop in Property.objects.order_by("id").iterator(chunk_size=500):
+        image = prop.main_image
+        prop.list_cards = build_list_cards(prop, image.url if image else None)
+        batch.append(prop)
+        if len(batch) == 500:
+            Property.objects.bulk_update(batch, ["list_cards"])
+            batch = []
+    Property.objects.bulk_update(batch, ["list_cards"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0005_property_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='list_cards',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(backfill_list_cards, migrations.RunPython.noop),
+    ]
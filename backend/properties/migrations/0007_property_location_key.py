@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:43
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def fold_location(value):
+    """Frozen copy of properties.locations.fold_location."""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+def backfill_location_key(apps, schema_editor):
+    Property = apps.get_model("properties", "Property")
+    for prop in Property.objects.only("id", "location"):
+        prop.location_key = fold_location(prop.location)
+        prop.save(update_fields=["location_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0006_property_list_cards'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='location_key',
+            field=models.CharField(blank=True, editable=False, help_text='Maintained on save: accent- and case-folded location', max_length=200),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['location_key'], name='property_active_location_idx'),
+        ),
+        migrations.RunPython(backfill_location_key, migrations.RunPython.noop),
+    ]
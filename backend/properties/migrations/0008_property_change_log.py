@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:45
+
+from django.db import migrations, models
+
+
+def backfill_change_log(apps, schema_editor):
+    # Seed the log in updated_at order so a replay from the start sees every listing
+    Property = apps.get_model("properties", "Property")
+    PropertyChange = apps.get_model("properties", "PropertyChange")
+    rows = Property.objects.order_by("updated_at", "id").values_list("id", "ref", "is_active", "updated_at")
+    PropertyChange.objects.bulk_create(
+        [
+            PropertyChange(
+                property_id=pk, ref=ref, action="upsert" if is_active else "delete", changed_at=updated_at,
+            )
+            for pk, ref, is_active, updated_at in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0007_property_location_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('property_id', models.BigIntegerField(db_index=True)),
+                ('ref', models.CharField(max_length=50)),
+                ('action', models.CharField(choices=[('upsert', 'Created or updated'), ('delete', 'Deactivated or deleted')], max_length=10)),
+                ('changed_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.RunPython(backfill_change_log, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+
+FTS_TABLE = "properties_property_fts"
+
+# Keep in sync with 0004_property_search_index and properties.search.SEARCH_COLUMNS
+COLUMNS = [
+    ("location", "new.location"),
+] + [
+    (f"{field}_{lang}", f"json_extract(new.{field}, '$.{lang}')")
+    for lang in ("it", "en", "de")
+    for field in ("title", "description", "composition")
+]
+
+INSERT_ROW = "INSERT INTO {table}(rowid, {columns}) VALUES (new.id, {values});".format(
+    table=FTS_TABLE,
+    columns=", ".join(name for name, _ in COLUMNS),
+    values=", ".join(expr for _, expr in COLUMNS),
+)
+DELETE_ROW = f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id;"
+
+# 0005-0007 rebuild properties_property on SQLite, which drops the triggers
+# 0004 created; recreate them and reindex rows written in the meantime.
+FORWARD_SQL = [
+    f"CREATE TRIGGER IF NOT EXISTS properties_property_fts_ai AFTER INSERT ON properties_property BEGIN {INSERT_ROW} END;",
+    f"CREATE TRIGGER IF NOT EXISTS properties_property_fts_ad AFTER DELETE ON properties_property BEGIN {DELETE_ROW} END;",
+    "CREATE TRIGGER IF NOT EXISTS properties_property_fts_au AFTER UPDATE OF location, title, description, composition "
+    f"ON properties_property BEGIN {DELETE_ROW} {INSERT_ROW} END;",
+    f"DELETE FROM {FTS_TABLE};",
+    "INSERT INTO {table}(rowid, {columns}) SELECT id, {values} FROM properties_property;".format(
+        table=FTS_TABLE,
+        columns=", ".join(name for name, _ in COLUMNS),
+        values=", ".join(expr.replace("new.", "") for _, expr in COLUMNS),
+    ),
+]
+
+
+def forward(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in FORWARD_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0008_property_change_log"),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0009_restore_search_triggers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='neighbours',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
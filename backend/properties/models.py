@@ -1,5 +1,8 @@
 from django.db import models
 
+from .geo import geohash_for
+from .locations import fold_location
+
 LANGUAGES = ("it", "en", "de")
 
 PROPERTY_TYPE_CHOICES = [
@@ -33,6 +36,7 @@ class Property(models.Model):
 
     # Non-translatable fields
     location = models.CharField(max_length=200)
+    location_key = models.CharField(max_length=200, blank=True, editable=False, help_text="Maintained on save: accent- and case-folded location")
     price = models.DecimalField(max_digits=12, decimal_places=2)
     ref = models.CharField(max_length=50, unique=True)
 
@@ -52,6 +56,12 @@ class Property(models.Model):
 
     latitude = models.DecimalField(max_digits=10, decimal_places=7, null=True, blank=True)
     longitude = models.DecimalField(max_digits=10, decimal_places=7, null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, editable=False, help_text="Maintained on save from latitude/longitude")
+
+    # Finished list-card payload per language, see properties.projections
+    list_cards = models.JSONField(default=dict, blank=True, editable=False)
+    # Most similar listing ids, stored by ``manage.py rebuild_similar``; null until its first run
+    neighbours = models.JSONField(null=True, blank=True, editable=False)
 
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -60,11 +70,46 @@ class Property(models.Model):
     class Meta:
         verbose_name_plural = "Properties"
         ordering = ["-created_at"]
+        # Partial indexes for the public listing: every query filters
+        # is_active, optionally property_type, and sorts by one of these
+        # columns with id as the keyset tie-breaker.
+        indexes = [
+            models.Index(fields=["created_at", "id"], condition=models.Q(is_active=True), name="property_active_created_idx"),
+            models.Index(fields=["price", "id"], condition=models.Q(is_active=True), name="property_active_price_idx"),
+            models.Index(fields=["area", "id"], condition=models.Q(is_active=True), name="property_active_area_idx"),
+            models.Index(fields=["property_type", "created_at", "id"], condition=models.Q(is_active=True), name="property_type_created_idx"),
+            models.Index(fields=["property_type", "price", "id"], condition=models.Q(is_active=True), name="property_type_price_idx"),
+            models.Index(fields=["property_type", "area", "id"], condition=models.Q(is_active=True), name="property_type_area_idx"),
+            models.Index(fields=["geohash"], condition=models.Q(is_active=True), name="property_active_geohash_idx"),
+            models.Index(fields=["location_key"], condition=models.Q(is_active=True), name="property_active_location_idx"),
+        ]
 
     def __str__(self):
         title_str = self.title.get("it", "") if isinstance(self.title, dict) else str(self.title)
         return f"{self.ref} - {title_str}"
 
+    def save(self, *args, **kwargs):
+        from .projections import CARD_COLUMNS, build_list_cards, card_row
+
+        self.geohash = geohash_for(self.latitude, self.longitude)
+        self.location_key = fold_location(self.location)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "main_image" in update_fields:
+            # Commit a pending upload first: storage may rename the file, and
+            # the card must point at the stored name (pre_save is idempotent)
+            self._meta.get_field("main_image").pre_save(self, self._state.adding)
+        self.list_cards = build_list_cards(card_row(self))
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if {"latitude", "longitude"} & update_fields:
+                update_fields.add("geohash")
+            if "location" in update_fields:
+                update_fields.add("location_key")
+            if set(CARD_COLUMNS) & update_fields:
+                update_fields.add("list_cards")
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
+
 
 class PropertyImage(models.Model):
     property = models.ForeignKey(
@@ -78,3 +123,26 @@ class PropertyImage(models.Model):
 
     def __str__(self):
         return f"Image for {self.property.ref}"
+
+
+class PropertyChange(models.Model):
+    """Append-only change log behind the /api/properties/changes/ feed.
+
+    Written by signals; only the latest entry per property is kept, so a
+    full replay costs the size of the catalogue and a sync the size of the
+    delta. The auto-increment id is the feed position.
+    """
+    UPSERT = "upsert"
+    DELETE = "delete"
+    ACTION_CHOICES = [(UPSERT, "Created or updated"), (DELETE, "Deactivated or deleted")]
+
+    property_id = models.BigIntegerField(db_index=True)
+    ref = models.CharField(max_length=50)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    changed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"#{self.pk} {self.action} {self.ref}"
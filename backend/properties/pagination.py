@@ -0,0 +1,133 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .cache import get_cached_count
+from .filters import get_ordering
+from .models import Property
+
+
+class PropertyPagination(PageNumberPagination):
+    page_size = 9
+    page_size_query_param = "page_size"
+    max_page_size = 50
+
+
+class PropertyCursorPagination(BasePagination):
+    """Keyset pagination over the listing sort orders, with ``id`` as tie-breaker.
+
+    Each page is a single indexed range scan: no OFFSET and no COUNT(*).
+    The total is only returned on ``include_total=true`` and comes from the
+    per-catalogue-version count cache.
+    """
+
+    page_size = PropertyPagination.page_size
+    page_size_query_param = PropertyPagination.page_size_query_param
+    max_page_size = PropertyPagination.max_page_size
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def encode_cursor(self, row, reverse):
+        if not isinstance(row, dict):
+            row = {"id": row.pk, self.field: getattr(row, self.field)}
+        value = row[self.field]
+        payload = {
+            "o": self.ordering,
+            "v": value.isoformat() if hasattr(value, "isoformat") else str(value),
+            "id": row["id"],
+            "r": int(reverse),
+        }
+        token = base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode("ascii"))
+        return token.decode("ascii").rstrip("=")
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            if payload["o"] != self.ordering:
+                raise ValueError("cursor belongs to another ordering")
+            value = Property._meta.get_field(self.field).to_python(payload["v"])
+            return {"value": value, "id": int(payload["id"]), "reverse": bool(payload["r"])}
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        filtered = queryset
+        self.page_size = self.get_page_size(request)
+        self.ordering = get_ordering(request.query_params, allow_relevance=False)
+        self.field = self.ordering.lstrip("-")
+        descending = self.ordering.startswith("-")
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor["reverse"])
+        # Walking backwards flips the scan direction; results are re-reversed below
+        scan_descending = descending != reverse
+
+        if cursor:
+            lookup = "lt" if scan_descending else "gt"
+            queryset = queryset.filter(
+                Q(**{f"{self.field}__{lookup}": cursor["value"]})
+                | Q(**{self.field: cursor["value"], f"id__{lookup}": cursor["id"]})
+            )
+        prefix = "-" if scan_descending else ""
+        queryset = queryset.order_by(f"{prefix}{self.field}", f"{prefix}id")
+
+        self.total = None
+        if request.query_params.get("include_total") in ("1", "true"):
+            self.total = get_cached_count(filtered, request.query_params)
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = rows
+        return rows
+
+    def _link(self, row, reverse):
+        url = remove_query_param(self.request.build_absolute_uri(), "page")
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(row, reverse))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._link(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        payload = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+        if self.total is not None:
+            payload["count"] = self.total
+        return Response(payload)
@@ -0,0 +1,74 @@
+"""Denormalized per-language list cards stored on ``Property.list_cards``.
+
+A card is the finished PropertyListSerializer payload minus ``id`` (which
+does not exist before the first INSERT). Cards are rebuilt on save and by
+``manage.py rebuild_list_cards``; list requests then only pick a language.
+"""
+from .models import LANGUAGES, Property
+from .row_serializers import LIST_COLUMNS, list_fields, serialize_rows
+
+# Columns a card is derived from; saving any of them rebuilds the cards
+CARD_COLUMNS = tuple(column for column in LIST_COLUMNS if column != "id")
+
+_CARD_FIELDS = {
+    lang: [(key, value) for key, value in list_fields(lang) if key != "id"]
+    for lang in LANGUAGES
+}
+
+
+def card_row(obj):
+    """Column values of a Property instance in the shape values() returns."""
+    row = {}
+    for column in CARD_COLUMNS:
+        field = obj._meta.get_field(column)
+        value = getattr(obj, column)
+        row[column] = value.name if column == "main_image" else field.to_python(value)
+    return row
+
+
+def build_list_cards(row):
+    return {
+        lang: {key: value(row) for key, value in fields}
+        for lang, fields in _CARD_FIELDS.items()
+    }
+
+
+def project_list_rows(rows, lang):
+    """List payloads for values("id", "list_cards", ...) rows.
+
+    Rows whose cards were never built (bulk inserts bypass save()) are
+    serialized from their columns, fetched in one extra query.
+    """
+    if lang not in LANGUAGES:
+        lang = "it"
+    rows = list(rows)
+    missing = [row["id"] for row in rows if lang not in (row["list_cards"] or {})]
+    fallback = {}
+    if missing:
+        columns = Property.objects.filter(id__in=missing).values(*LIST_COLUMNS)
+        fallback = {item["id"]: item for item in serialize_rows(columns, list_fields(lang))}
+    return [
+        fallback[row["id"]] if row["id"] in fallback else {"id": row["id"], **row["list_cards"][lang]}
+        for row in rows
+    ]
+
+
+def rebuild_list_cards(queryset, batch_size=500):
+    """Recompute list_cards for every row of ``queryset``; returns the row count.
+
+    Uses bulk_update, so neither updated_at nor the save signals fire; the
+    caller is responsible for bumping the catalogue version.
+    """
+    updated = 0
+    batch = []
+    for obj in queryset.only("id", *CARD_COLUMNS).iterator(chunk_size=batch_size):
+        obj.list_cards = build_list_cards(card_row(obj))
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            updated += len(batch)
+            queryset.model.objects.bulk_update(batch, ["list_cards"])
+            batch = []
+    if batch:
+        updated += len(batch)
+        queryset.model.objects.bulk_update(batch, ["list_cards"])
+    return updated
@@ -0,0 +1,190 @@
+"""Plain-dict serializers for ``values()`` rows.
+
+They produce exactly what PropertyListSerializer / PropertyDetailSerializer
+produce (same keys, order and values), but resolve the language once per
+request and run one precomputed callable per field instead of going
+through DRF's field machinery.
+"""
+from functools import lru_cache
+from operator import itemgetter
+
+from rest_framework.exceptions import ValidationError
+
+from translations.db import localized_values
+
+from .models import Property, PropertyImage
+from .serializers import (
+    format_area, format_map_location, format_optional_area, format_optional_fees,
+    format_price, localize,
+)
+
+LIST_COLUMNS = (
+    "id", "main_image", "title", "price", "location", "ref",
+    "area", "bedrooms", "bathrooms",
+)
+
+DETAIL_COLUMNS = (
+    "id", "title", "location", "price", "ref",
+    "area", "commercial_area", "net_area",
+    "bedrooms", "bathrooms", "total_rooms",
+    "energy_class", "condominium_fees",
+    "description", "composition", "composition_note",
+    "location_note", "main_image", "latitude", "longitude",
+)
+
+# Translation JSON columns of the detail payload -> whether they hold lists
+DETAIL_TRANSLATED = {
+    "title": False,
+    "description": False,
+    "composition": True,
+    "composition_note": False,
+    "location_note": False,
+}
+
+
+# Detail payload keys that are not read from a column of the same name
+DETAIL_SOURCES = {
+    "gallery_images": (),
+    "map_location": ("latitude", "longitude"),
+}
+
+
+def parse_fields(value, available):
+    """Keys requested by a ``fields=`` sparse fieldset, or None for the full payload.
+
+    ``id`` is always included so clients can match items to requests.
+    """
+    requested = [name.strip() for name in (value or "").split(",") if name.strip()]
+    if not requested:
+        return None
+    unknown = [name for name in requested if name not in available]
+    if unknown:
+        raise ValidationError({"fields": f"Unknown field(s): {', '.join(unknown)}."})
+    return frozenset(requested) | {"id"}
+
+
+def select_fields(fields, requested):
+    """Keep the (key, callable) pairs of a sparse fieldset, in payload order."""
+    if requested is None:
+        return fields
+    return [(key, value) for key, value in fields if key in requested]
+
+
+def detail_columns(requested):
+    """DETAIL_COLUMNS needed to build the requested detail keys."""
+    if requested is None:
+        return DETAIL_COLUMNS
+    needed = {"id"}
+    for key in requested:
+        needed.update(DETAIL_SOURCES.get(key, (key,)))
+    return tuple(column for column in DETAIL_COLUMNS if column in needed)
+
+
+@lru_cache(maxsize=65536)
+def _storage_url(model, column, name):
+    # Storage.url() quotes and joins on every call; file names are stable
+    return model._meta.get_field(column).storage.url(name)
+
+
+def _media_url(column):
+    def url(row):
+        name = row[column]
+        return _storage_url(Property, column, name) if name else None
+    return url
+
+
+def _localized(column, lang):
+    return lambda row: localize(row[column], lang)
+
+
+def _formatted(column, formatter):
+    return lambda row: formatter(row[column])
+
+
+def list_fields(lang):
+    """(key, callable) pairs for one list card, in PropertyListSerializer order."""
+    return [
+        ("id", itemgetter("id")),
+        ("image", _media_url("main_image")),
+        ("title", _localized("title", lang)),
+        ("price", _formatted("price", format_price)),
+        ("location", itemgetter("location")),
+        ("ref", itemgetter("ref")),
+        ("area", _formatted("area", format_area)),
+        ("bedrooms", itemgetter("bedrooms")),
+        ("bathrooms", itemgetter("bathrooms")),
+    ]
+
+
+def detail_fields(lang, gallery):
+    """(key, callable) pairs for a detail payload, in PropertyDetailSerializer order.
+
+    ``gallery`` maps property id to its ordered gallery image URLs.
+    """
+    return [
+        ("id", itemgetter("id")),
+        ("title", _localized("title", lang)),
+        ("location", itemgetter("location")),
+        ("price", _formatted("price", format_price)),
+        ("ref", itemgetter("ref")),
+        ("area", _formatted("area", format_area)),
+        ("commercial_area", _formatted("commercial_area", format_optional_area)),
+        ("net_area", _formatted("net_area", format_optional_area)),
+        ("bedrooms", itemgetter("bedrooms")),
+        ("bathrooms", itemgetter("bathrooms")),
+        ("total_rooms", itemgetter("total_rooms")),
+        ("energy_class", itemgetter("energy_class")),
+        ("condominium_fees", _formatted("condominium_fees", format_optional_fees)),
+        ("description", _localized("description", lang)),
+        ("composition", _localized("composition", lang)),
+        ("composition_note", _localized("composition_note", lang)),
+        ("location_note", _localized("location_note", lang)),
+        ("main_image", _media_url("main_image")),
+        ("gallery_images", lambda row: gallery.get(row["id"], [])),
+        ("map_location", lambda row: format_map_location(row["latitude"], row["longitude"])),
+    ]
+
+
+LIST_KEYS = tuple(key for key, _ in list_fields("it"))
+DETAIL_KEYS = tuple(key for key, _ in detail_fields("it", {}))
+
+
+def localized_detail_rows(queryset, lang, columns=DETAIL_COLUMNS):
+    """values() rows for the detail payload with translations reduced to ``lang`` in SQL.
+
+    Only the requested language (or its Italian fallback) leaves the
+    database; ``localize()`` passes the resulting plain values through.
+    ``columns`` narrows the SELECT for sparse fieldsets.
+    """
+    plain = [column for column in columns if column not in DETAIL_TRANSLATED]
+    translated = {name: is_list for name, is_list in DETAIL_TRANSLATED.items() if name in columns}
+    rows = queryset.values(*plain, **localized_values(translated, lang))
+    for row in rows:
+        for name in translated:
+            row[name] = row.pop(f"{name}_localized")
+        yield row
+
+
+def serialize_rows(rows, fields):
+    return [{key: value(row) for key, value in fields} for row in rows]
+
+
+def sparse(items, requested):
+    """Trim already-built payloads to a sparse fieldset."""
+    if requested is None:
+        return items
+    return [{key: value for key, value in item.items() if key in requested} for item in items]
+
+
+def gallery_urls(property_ids):
+    """Ordered gallery image URLs per property id, in one query."""
+    gallery = {}
+    images = (
+        PropertyImage.objects.filter(property_id__in=property_ids)
+        .exclude(image="")
+        .order_by("order", "id")
+        .values_list("property_id", "image")
+    )
+    for property_id, name in images:
+        gallery.setdefault(property_id, []).append(_storage_url(PropertyImage, "image", name))
+    return gallery
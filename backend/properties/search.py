@@ -0,0 +1,127 @@
+import re
+
+from django.db import connection
+from django.db.models import Expression, FloatField, Value
+from django.db.models.sql.constants import INNER
+
+from .models import LANGUAGES
+
+# FTS5 table kept in sync by triggers on properties_property. Both are
+# created by migrations (0004, 0009); SQLite drops a table's triggers when a
+# migration rebuilds it, so such a migration must recreate them as 0009 does.
+FTS_TABLE = "properties_property_fts"
+
+# Column order of the FTS5 table (see migration 0004) with BM25 weights
+SEARCH_COLUMNS = [("location", 5.0)] + [
+    (f"{field}_{lang}", weight)
+    for lang in LANGUAGES
+    for field, weight in (("title", 10.0), ("description", 1.0), ("composition", 2.0))
+]
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match_expression(q, lang="it"):
+    """Turn free text into an FTS5 query restricted to one language's columns.
+
+    Every word becomes a quoted prefix term, so user input can never inject
+    FTS5 syntax. Non-Italian searches also look at the Italian columns, the
+    same fallback ``localize()`` applies when a translation is missing.
+    """
+    tokens = TOKEN_RE.findall(q)
+    if not tokens:
+        return None
+    langs = [lang] if lang == "it" else [lang, "it"]
+    columns = ["location"] + [
+        f"{field}_{code}" for code in langs for field in ("title", "description", "composition")
+    ]
+    terms = " ".join(f'"{token}"*' for token in tokens)
+    return f"{{{' '.join(columns)}}} : ({terms})"
+
+
+def search_properties(queryset, q, lang="it"):
+    """Restrict a Property queryset to full-text matches, annotated with ``search_rank``.
+
+    Lower ``search_rank`` is better (BM25 as returned by SQLite). On backends
+    without FTS5 this degrades to a location substring match.
+    """
+    if lang not in LANGUAGES:
+        lang = "it"
+    if connection.vendor != "sqlite":
+        return queryset.filter(location__icontains=q).annotate(search_rank=Value(0.0))
+
+    expression = build_match_expression(q, lang)
+    if expression is None:
+        return queryset.annotate(search_rank=Value(0.0))
+
+    queryset = queryset.all()
+    query = queryset.query
+    alias = query.join(MatchJoin(expression, query.get_initial_alias()))
+    return queryset.annotate(search_rank=MatchRank(alias))
+
+
+class MatchJoin:
+    """``INNER JOIN (SELECT rowid, bm25(...) AS rank ... MATCH %s) ON rowid = id``.
+
+    Runs the MATCH once per query. A correlated bm25() subquery has to repeat
+    it for every row, since FTS5 cannot seek a MATCH to one rowid. Implements
+    the alias_map entry interface documented on django's ``Join``.
+    """
+
+    join_type = INNER
+    nullable = False
+    filtered_relation = None
+
+    def __init__(self, expression, parent_alias, table_alias=None):
+        self.expression = expression
+        self.parent_alias = parent_alias
+        self.table_alias = table_alias
+        self.table_name = f"{FTS_TABLE}_match"
+
+    def as_sql(self, compiler, connection):
+        qn = compiler.quote_name_unless_alias
+        weights = ", ".join(str(weight) for _, weight in SEARCH_COLUMNS)
+        alias, parent = qn(self.table_alias), qn(self.parent_alias)
+        sql = (
+            f"{self.join_type} (SELECT rowid, bm25({FTS_TABLE}, {weights}) AS rank "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s) {alias} ON ({alias}.rowid = {parent}.id)"
+        )
+        return sql, [self.expression]
+
+    def relabeled_clone(self, change_map):
+        return self.__class__(
+            self.expression,
+            change_map.get(self.parent_alias, self.parent_alias),
+            change_map.get(self.table_alias, self.table_alias),
+        )
+
+    @property
+    def identity(self):
+        return self.__class__, self.table_name, self.parent_alias, self.expression
+
+    def __eq__(self, other):
+        return isinstance(other, MatchJoin) and self.identity == other.identity
+
+    def __hash__(self):
+        return hash(self.identity)
+
+    def demote(self):
+        return self.relabeled_clone({})
+
+    promote = demote
+
+
+class MatchRank(Expression):
+    """The BM25 ``rank`` column of the MatchJoin at ``alias``."""
+
+    output_field = FloatField()
+
+    def __init__(self, alias):
+        super().__init__()
+        self.alias = alias
+
+    def relabeled_clone(self, change_map):
+        return self.__class__(change_map.get(self.alias, self.alias))
+
+    def as_sql(self, compiler, connection):
+        return f"{compiler.quote_name_unless_alias(self.alias)}.rank", []
@@ -16,6 +16,35 @@ def localize(value, lang, fallback="it"):
     return value
 
 
+def format_price(price):
+    """Format a price as "1.250.000€" (Italian thousands separator)."""
+    formatted = f"{int(price):,}".replace(",", ".")
+    return f"{formatted}€"
+
+
+def _trim(value):
+    """Drop the decimal part of whole numbers: Decimal("180.00") -> 180."""
+    return int(value) if value == int(value) else value
+
+
+def format_area(area):
+    return f"{_trim(area)}m²"
+
+
+def format_optional_area(area):
+    return format_area(area) if area else None
+
+
+def format_optional_fees(fees):
+    return f"{_trim(fees)}€" if fees else None
+
+
+def format_map_location(latitude, longitude):
+    if latitude and longitude:
+        return {"lat": float(latitude), "lng": float(longitude)}
+    return None
+
+
 class PropertyImageSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
 
@@ -53,13 +82,10 @@ class PropertyListSerializer(serializers.ModelSerializer):
         return localize(obj.title, self._lang())
 
     def get_price(self, obj):
-        price_int = int(obj.price)
-        formatted = f"{price_int:,}".replace(",", ".")
-        return f"{formatted}€"
+        return format_price(obj.price)
 
     def get_area(self, obj):
-        area_val = int(obj.area) if obj.area == int(obj.area) else obj.area
-        return f"{area_val}m²"
+        return format_area(obj.area)
 
 
 class PropertyDetailSerializer(serializers.ModelSerializer):
@@ -118,33 +144,19 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
         return [media_path(img.image) for img in images if img.image]
 
     def get_price(self, obj):
-        price_int = int(obj.price)
-        formatted = f"{price_int:,}".replace(",", ".")
-        return f"{formatted}€"
+        return format_price(obj.price)
 
     def get_area(self, obj):
-        area_val = int(obj.area) if obj.area == int(obj.area) else obj.area
-        return f"{area_val}m²"
+        return format_area(obj.area)
 
     def get_commercial_area(self, obj):
-        if obj.commercial_area:
-            val = int(obj.commercial_area) if obj.commercial_area == int(obj.commercial_area) else obj.commercial_area
-            return f"{val}m²"
-        return None
+        return format_optional_area(obj.commercial_area)
 
     def get_net_area(self, obj):
-        if obj.net_area:
-            val = int(obj.net_area) if obj.net_area == int(obj.net_area) else obj.net_area
-            return f"{val}m²"
-        return None
+        return format_optional_area(obj.net_area)
 
     def get_condominium_fees(self, obj):
-        if obj.condominium_fees:
-            val = int(obj.condominium_fees) if obj.condominium_fees == int(obj.condominium_fees) else obj.condominium_fees
-            return f"{val}€"
-        return None
+        return format_optional_fees(obj.condominium_fees)
 
     def get_map_location(self, obj):
-        if obj.latitude and obj.longitude:
-            return {"lat": float(obj.latitude), "lng": float(obj.longitude)}
-        return None
+        return format_map_location(obj.latitude, obj.longitude)
@@ -0,0 +1,37 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_catalogue_version
+from .changes import record_change
+from .models import Property, PropertyImage
+
+
+@receiver(post_save, sender=Property)
+def log_property_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_change(instance.pk, instance.ref, instance.is_active, instance.updated_at)
+
+
+@receiver(post_delete, sender=Property)
+def log_property_delete(sender, instance, **kwargs):
+    record_change(instance.pk, instance.ref, active=False)
+
+
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_delete, sender=PropertyImage)
+def log_gallery_change(sender, instance, raw=False, **kwargs):
+    # The gallery is part of the detail payload, so its listing changed too
+    if raw:
+        return
+    row = Property.objects.filter(pk=instance.property_id).values_list("ref", "is_active").first()
+    if row is not None:
+        record_change(instance.property_id, *row)
+
+
+# Registered after the change-log receivers: the new version is the id they wrote
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_delete, sender=PropertyImage)
+def invalidate_catalogue(sender, **kwargs):
+    bump_catalogue_version()
@@ -0,0 +1,170 @@
+"""In-memory columnar snapshot of the active catalogue for list requests.
+
+The snapshot holds NumPy columns for the filterable and sortable fields and
+one presorted index array per listing order, so filter + sort + paginate is
+a handful of vectorized masks instead of a SQLite query. It is immutable and
+rebuilt per catalogue version through ``CatalogueMemo``; requests it cannot
+answer exactly (full-text search, map filters, keyset pagination) return
+``None`` and go through the ORM as before.
+
+Enabled with ``PROPERTY_SNAPSHOT_ENGINE = True``; a no-op without NumPy.
+"""
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+
+from .cache import CatalogueMemo
+from .filters import SORT_MAPPING, get_ordering
+from .locations import location_trie
+from .models import Property, PropertyChange
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+SNAPSHOT_COLUMNS = (
+    "id", "list_cards", "created_at", "updated_at",
+    "price", "area", "property_type", "location_key",
+)
+
+# Filters the snapshot does not evaluate; their presence defers to the ORM
+ORM_ONLY_PARAMS = ("q", "bbox", "near")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _micros(value):
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def _frozen(values, dtype):
+    array = np.array(values, dtype=dtype)
+    array.flags.writeable = False
+    return array
+
+
+def _decimal(value):
+    try:
+        number = Decimal(value)
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+    return float(number) if number.is_finite() else None
+
+
+class CatalogueSnapshot:
+    """Immutable column arrays for the active catalogue."""
+
+    def __init__(self, rows, last_change=None, last_change_id=None):
+        # Latest change-log entry, so deletions advance Last-Modified and the ETag
+        self.last_change = last_change
+        self.last_change_id = last_change_id
+        self.rows = [{"id": row["id"], "list_cards": row["list_cards"]} for row in rows]
+        self.updated_at = [row["updated_at"] for row in rows]
+        self.ids = _frozen([row["id"] for row in rows], np.int64)
+        self.price = _frozen([float(row["price"]) for row in rows], np.float64)
+        self.area = _frozen([float(row["area"]) for row in rows], np.float64)
+        self.created = _frozen([_micros(row["created_at"]) for row in rows], np.int64)
+        self.updated = _frozen([_micros(value) for value in self.updated_at], np.int64)
+
+        types, type_codes = np.unique([row["property_type"] for row in rows], return_inverse=True)
+        self.type_index = {name: code for code, name in enumerate(types.tolist())}
+        self.type_codes = _frozen(type_codes.reshape(-1), np.int32)
+
+        locations, location_codes = np.unique([row["location_key"] for row in rows], return_inverse=True)
+        self.location_index = {key: code for code, key in enumerate(locations.tolist())}
+        self.location_codes = _frozen(location_codes.reshape(-1), np.int32)
+
+        # Same order as the ORM: the sort column, then id in the same direction
+        columns = {"created_at": self.created, "price": self.price, "area": self.area}
+        self.orders = {}
+        for ordering in SORT_MAPPING.values():
+            column = columns[ordering.lstrip("-")]
+            if ordering.startswith("-"):
+                order = np.lexsort((-self.ids, -column))
+            else:
+                order = np.lexsort((self.ids, column))
+            self.orders[ordering] = _frozen(order, np.int64)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def mask(self, params):
+        """Boolean row mask for the listing filters, or None to defer to the ORM."""
+        if any(params.get(name) for name in ORM_ONLY_PARAMS):
+            return None
+        mask = np.ones(len(self), dtype=bool)
+
+        location = params.get("location")
+        if location:
+            keys = location_trie.get().matching_keys(location)
+            codes = [self.location_index[key] for key in keys if key in self.location_index]
+            mask &= np.isin(self.location_codes, codes)
+
+        for name, compare in (("price_min", np.greater_equal), ("price_max", np.less_equal)):
+            value = params.get(name)
+            if value:
+                bound = _decimal(value)
+                if bound is None:
+                    return None
+                mask &= compare(self.price, bound)
+
+        property_type = params.get("property_type")
+        if property_type:
+            code = self.type_index.get(property_type)
+            if code is None:
+                return np.zeros(len(self), dtype=bool)
+            mask &= self.type_codes == code
+
+        return mask
+
+    def select(self, params):
+        """Row positions matching ``params`` in listing order, or None to defer to the ORM."""
+        mask = self.mask(params)
+        if mask is None:
+            return None
+        order = self.orders[get_ordering(params)]
+        return SnapshotResult(self, order[mask[order]])
+
+
+class SnapshotResult:
+    """Ordered matches plus the validators the ORM path would compute."""
+
+    def __init__(self, snapshot, positions):
+        self.snapshot = snapshot
+        self.positions = positions
+
+    @property
+    def count(self):
+        return len(self.positions)
+
+    @property
+    def last_modified(self):
+        if not self.count:
+            return None
+        updated_at = self.snapshot.updated_at[self.positions[np.argmax(self.snapshot.updated[self.positions])]]
+        return max(filter(None, (updated_at, self.snapshot.last_change)))
+
+    @property
+    def last_change_id(self):
+        return self.snapshot.last_change_id if self.count else None
+
+    def rows(self, positions):
+        return [self.snapshot.rows[position] for position in positions]
+
+
+def build_snapshot():
+    rows = Property.objects.filter(is_active=True).order_by().values(*SNAPSHOT_COLUMNS)
+    latest = PropertyChange.objects.order_by("-id").values_list("id", "changed_at").first()
+    last_change_id, last_change = latest or (None, None)
+    return CatalogueSnapshot(list(rows), last_change, last_change_id)
+
+
+catalogue_snapshot = CatalogueMemo(build_snapshot)
+
+
+def snapshot_enabled():
+    return np is not None and getattr(settings, "PROPERTY_SNAPSHOT_ENGINE", False)
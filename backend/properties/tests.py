@@ -0,0 +1,1039 @@
+import os
+import random
+import shutil
+import statistics
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from importlib import import_module
+from io import BytesIO
+from unittest import mock, skipUnless
+from urllib.parse import parse_qs, urlsplit
+
+from django.apps import apps as django_apps
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.template.loader import get_template
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from config.renderers import FastJSONParser, FastJSONRenderer
+from translations.bundles import LOCALES_DIR
+
+from .cache import CATALOGUE_VERSION_KEY, LOCAL_VERSION_TIMEOUT, _version_timeout, get_catalogue_version
+from .filters import MAX_RADIUS_KM, SORT_MAPPING, filter_properties
+from .fragments import CARD_TEMPLATES, DETAIL_TEMPLATE, detail_stamp, fragment_key
+from .geo import haversine_km
+from .market import MarketRows, market_data
+from .models import Property, PropertyChange, PropertyImage
+from .row_serializers import (
+    DETAIL_COLUMNS, detail_fields, gallery_urls, list_fields, localized_detail_rows, serialize_rows,
+)
+from .serializers import PropertyDetailSerializer, PropertyListSerializer
+from .similar import build_neighbours, rebuild_similar
+from .snapshot import catalogue_snapshot, np
+
+
+def touch(path, test):
+    """Advance ``path``'s mtime for the rest of ``test``."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    test.addCleanup(os.utime, path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def create_property(index, **overrides):
+    data = {
+        "title": {"it": f"Villa {index}", "en": f"Villa {index}", "de": f"Villa {index}"},
+        "description": {"it": "Descrizione " * 50, "en": "Description " * 50, "de": ""},
+        "composition": {"it": ["Soggiorno", "Cucina"], "en": ["Living room", "Kitchen"], "de": []},
+        "location": "Salò",
+        "price": Decimal(250000 + index * 1000),
+        "ref": f"RF: {index:05d}",
+        "area": Decimal(80 + index),
+        "bedrooms": 2,
+        "bathrooms": 1,
+        "property_type": "villa",
+        "main_image": f"properties/main/property_{index}.png",
+        "latitude": Decimal("45.6064000"),
+        "longitude": Decimal("10.5264000"),
+    }
+    data.update(overrides)
+    return Property.objects.create(**data)
+
+
+class PropertyQueryCountTests(TestCase):
+    """Pin the number of queries each property endpoint runs."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.properties = [create_property(i) for i in range(12)]
+        for order in range(4):
+            PropertyImage.objects.create(
+                property=cls.properties[0], image=f"properties/gallery/{order}.png", order=order,
+            )
+
+    def setUp(self):
+        cache.clear()
+        # Read once per process per LOCAL_VERSION_TIMEOUT, not per request
+        get_catalogue_version()
+
+    def test_list_queries(self):
+        # validators aggregate, COUNT(*) for pagination, page of rows
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/properties/?lang=en")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 9)
+
+    def test_list_queries_when_cached(self):
+        self.client.get("/api/properties/?lang=en")
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/properties/?lang=en")
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_list_defers_translation_blobs(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/api/properties/")
+        page_sql = queries.captured_queries[-1]["sql"]
+        for column in ("description", "composition", "composition_note", "location_note"):
+            self.assertNotIn(f'"properties_property"."{column}"', page_sql)
+
+    def test_cursor_list_queries(self):
+        # validators aggregate and a single keyset page; no COUNT(*)
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/properties/?pagination=cursor")
+        self.assertIsNotNone(response.json()["next"])
+
+    def test_detail_queries(self):
+        # validators aggregate, the property, one gallery prefetch
+        with self.assertNumQueries(3):
+            response = self.client.get(f"/api/properties/{self.properties[0].pk}/")
+        self.assertEqual(len(response.json()["gallery_images"]), 4)
+
+    def test_facets_queries(self):
+        with self.assertNumQueries(1):
+            self.client.get("/api/properties/facets/")
+
+    def test_batch_queries(self):
+        ids = ",".join(str(obj.pk) for obj in reversed(self.properties[:5]))
+        # validators aggregate, one IN query for the rows, one for all galleries
+        with self.assertNumQueries(3):
+            response = self.client.get(f"/api/properties/batch/?ids={ids},999999&lang=en")
+        data = response.json()
+        self.assertEqual([item["id"] for item in data["results"]], [int(pk) for pk in ids.split(",")])
+        self.assertEqual(data["missing"], [999999])
+        self.assertEqual(len(data["results"][-1]["gallery_images"]), 4)
+
+    def test_batch_uses_detail_cache(self):
+        first, second = self.properties[:2]
+        detail = self.client.get(f"/api/properties/{first.pk}/?lang=en").json()
+        with self.assertNumQueries(3):
+            response = self.client.get(f"/api/properties/batch/?ids={first.pk},{second.pk}&lang=en")
+        self.assertEqual(response.json()["results"][0], detail)
+        # validators aggregate and the ref -> id index, built once per catalogue version
+        with self.assertNumQueries(2):
+            self.client.get(f"/api/properties/batch/?refs={second.ref},{first.ref}&lang=en")
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/properties/{second.pk}/?lang=en")
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_sparse_detail_skips_gallery_and_blobs(self):
+        # validators aggregate and the narrowed row; no gallery query
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"/api/properties/{self.properties[0].pk}/", {"fields": "title,price"})
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(list(response.json()), ["id", "title", "price"])
+        for column in ("description", "composition", "latitude"):
+            self.assertNotIn(f'"properties_property"."{column}"', queries.captured_queries[-1]["sql"])
+
+    def test_sparse_batch_and_list(self):
+        ids = ",".join(str(obj.pk) for obj in self.properties[:3])
+        # validators aggregate and the narrowed rows; no gallery query
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/properties/batch/", {"ids": ids, "fields": "map_location"})
+        self.assertEqual(list(response.json()["results"][0]), ["id", "map_location"])
+        response = self.client.get("/api/properties/", {"fields": "image,title,price", "page_size": 6})
+        self.assertEqual(list(response.json()["results"][0]), ["id", "image", "title", "price"])
+        self.assertEqual(self.client.get("/api/properties/", {"fields": "description"}).status_code, 400)
+
+    def test_batch_limit(self):
+        ids = ",".join(str(pk) for pk in range(1, 102))
+        self.assertEqual(self.client.get(f"/api/properties/batch/?ids={ids}").status_code, 400)
+        self.assertEqual(self.client.get("/api/properties/batch/").status_code, 400)
+
+    def test_batch_ids_are_parsed_and_deduplicated(self):
+        pk = self.properties[0].pk
+        response = self.client.get("/api/properties/batch/", {"ids": f"{pk},0{pk}, {pk}"})
+        self.assertEqual([item["id"] for item in response.json()["results"]], [pk])
+        for ids in ("\u00b2", "1,x", "1.5"):
+            with self.subTest(ids=ids):
+                self.assertEqual(self.client.get("/api/properties/batch/", {"ids": ids}).status_code, 400)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.prop = create_property(0)
+        self.url = f"/api/properties/{self.prop.pk}/"
+
+    def test_miss_then_hit(self):
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "MISS")
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "HIT")
+        # other params are other entries
+        self.assertEqual(self.client.get(self.url, {"lang": "en"})["X-Cache"], "MISS")
+
+    def test_fieldset_order_and_repeats_share_an_entry(self):
+        response = self.client.get(self.url, {"fields": "title,price"})
+        self.assertEqual(response["X-Cache"], "MISS")
+        repeat = self.client.get(self.url, {"fields": " price,title,,title"})
+        self.assertEqual(repeat["X-Cache"], "HIT")
+        self.assertEqual(repeat["ETag"], response["ETag"])
+        self.assertEqual(self.client.get(self.url, {"fields": "id"})["X-Cache"], "MISS")
+
+    def test_save_bumps_version(self):
+        self.client.get(self.url)
+        version = get_catalogue_version()
+        self.prop.price = Decimal("123000")
+        self.prop.save()
+        self.assertGreater(get_catalogue_version(), version)
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["price"], "123.000€")
+
+    def test_delete_bumps_version(self):
+        other = create_property(1)
+        self.client.get("/api/properties/")
+        other.delete()
+        response = self.client.get("/api/properties/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["count"], 1)
+
+    def test_process_local_version_lapses(self):
+        self.assertEqual(_version_timeout(), LOCAL_VERSION_TIMEOUT)
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}):
+            self.assertIsNone(_version_timeout())
+
+    def test_lapsed_version_reads_back_unchanged(self):
+        version = get_catalogue_version()
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "MISS")
+        cache.delete(CATALOGUE_VERSION_KEY)
+        self.assertEqual(get_catalogue_version(), version)
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "HIT")
+
+    def test_cache_that_stores_nothing(self):
+        dummy = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+        with override_settings(CACHES=dummy):
+            self.assertEqual(get_catalogue_version(), PropertyChange.objects.latest("id").id)
+            for url in ("/api/properties/?location=salo", "/api/properties/stats/", "/api/properties/map/",
+                        "/api/properties/locations/?prefix=sa", f"/api/properties/{self.prop.pk}/similar/"):
+                with self.subTest(url=url):
+                    self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class ConditionalRequestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.properties = [create_property(index) for index in range(3)]
+        # Push every validator a minute back so a later change lands in a later second
+        past = timezone.now() - timedelta(minutes=1)
+        Property.objects.update(updated_at=past)
+        PropertyChange.objects.update(changed_at=past)
+
+    def test_etag_revalidation(self):
+        for url in ("/api/properties/", f"/api/properties/{self.properties[0].pk}/"):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b"")
+
+    def test_validators_ignore_the_cached_version(self):
+        pk = self.properties[0].pk
+        rebuild_similar()
+        for url in ("/api/properties/", f"/api/properties/{pk}/", f"/api/properties/{pk}/similar/",
+                    f"/api/properties/batch/?ids={pk}", "/api/properties/changes/", "/api/properties/map/",
+                    "/api/properties/stats/", "/api/properties/locations/?prefix=sa"):
+            with self.subTest(url=url):
+                etag = self.client.get(url)["ETag"]
+                # a worker whose copy of the version has not lapsed yet
+                cache.set(CATALOGUE_VERSION_KEY, 12345)
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+                cache.delete(CATALOGUE_VERSION_KEY)
+
+    def test_if_modified_since(self):
+        url = f"/api/properties/{self.properties[0].pk}/"
+        last_modified = self.client.get(url)["Last-Modified"]
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+        self.properties[0].save()
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+
+    def test_deletion_advances_list_last_modified(self):
+        last_modified = self.client.get("/api/properties/")["Last-Modified"]
+        self.properties[1].delete()
+        response = self.client.get("/api/properties/", HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 2)
+
+    def test_gallery_change_advances_detail_last_modified(self):
+        url = f"/api/properties/{self.properties[0].pk}/"
+        last_modified = self.client.get(url)["Last-Modified"]
+        PropertyImage.objects.create(property=self.properties[0], image="properties/gallery/x.png")
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+
+    def test_non_numeric_pk_is_404(self):
+        self.assertEqual(self.client.get("/api/properties/%C2%B2/").status_code, 404)
+        self.assertEqual(self.client.get("/api/properties/abc/").status_code, 404)
+
+
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        created = timezone.now() - timedelta(days=1)
+        for index in range(11):
+            # Three prices, areas and creation times shared by several listings
+            prop = create_property(index, price=Decimal(100000 * (index % 3 + 1)), area=Decimal(50 + index % 2))
+            Property.objects.filter(pk=prop.pk).update(created_at=created + timedelta(hours=index % 4))
+
+    def setUp(self):
+        cache.clear()
+
+    def ids(self, response):
+        return [item["id"] for item in response.json()["results"]]
+
+    def test_walks_every_sort_without_gaps_or_duplicates(self):
+        for sort in SORT_MAPPING:
+            with self.subTest(sort=sort):
+                expected = self.ids(self.client.get("/api/properties/", {"sort": sort, "page_size": 50}))
+                self.assertEqual(len(expected), 11)
+
+                pages = []
+                response = self.client.get("/api/properties/", {"sort": sort, "page_size": 4, "pagination": "cursor"})
+                while True:
+                    pages.append(self.ids(response))
+                    if not response.json()["next"]:
+                        break
+                    response = self.client.get(response.json()["next"])
+                self.assertEqual([len(page) for page in pages], [4, 4, 3])
+                self.assertEqual(sum(pages, []), expected)
+
+                # and back again through the previous links
+                for page in reversed(pages[:-1]):
+                    response = self.client.get(response.json()["previous"])
+                    self.assertEqual(self.ids(response), page)
+                self.assertIsNone(response.json()["previous"])
+
+    def test_cursor_must_match_sort(self):
+        response = self.client.get("/api/properties/", {"page_size": 4, "pagination": "cursor"})
+        cursor = parse_qs(urlsplit(response.json()["next"]).query)["cursor"][0]
+        self.assertEqual(self.client.get("/api/properties/", {"cursor": cursor}).status_code, 200)
+        response = self.client.get("/api/properties/", {"sort": "price_asc", "cursor": cursor})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get("/api/properties/", {"cursor": "garbage"}).status_code, 404)
+
+
+@skipUnless(connection.vendor == "sqlite", "full-text search uses SQLite FTS5")
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.title_hit = create_property(1, title={"it": "Attico panoramico", "en": "", "de": ""})
+        cls.description_hit = create_property(
+            2, description={"it": "Ampio attico con terrazza", "en": "", "de": ""},
+        )
+        cls.location_hit = create_property(3, location="Desenzano del Garda")
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, q, **params):
+        response = self.client.get("/api/properties/", {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [item["id"] for item in response.json()["results"]]
+
+    def test_title_match_outranks_description_match(self):
+        self.assertEqual(self.search("attico"), [self.title_hit.id, self.description_hit.id])
+
+    def test_prefix_and_accent_folding(self):
+        self.assertEqual(self.search("desenz"), [self.location_hit.id])
+        self.assertEqual(len(self.search("salo")), 2)
+
+    def test_falls_back_to_italian_columns(self):
+        self.assertEqual(self.search("panoramico", lang="en"), [self.title_hit.id])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.title_hit.title = {"it": "Rustico", "en": "", "de": ""}
+        self.title_hit.save()
+        self.assertEqual(self.search("attico"), [self.description_hit.id])
+        self.assertEqual(self.search("rustico"), [self.title_hit.id])
+        self.description_hit.delete()
+        self.assertEqual(self.search("attico"), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(self.search('attico" OR *'), [])
+        self.assertEqual(len(self.search("!!!")), 3)
+
+    def test_match_runs_once_per_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.search("attico")
+        searches = [query["sql"] for query in queries if "MATCH" in query["sql"]]
+        self.assertTrue(searches)
+        for sql in searches:
+            self.assertEqual(sql.count("MATCH"), 1, sql)
+
+
+class GeoFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.salo = create_property(1)
+        cls.sirmione = create_property(2, latitude=Decimal("45.4930000"), longitude=Decimal("10.6080000"))
+        cls.verona = create_property(3, latitude=Decimal("45.4384000"), longitude=Decimal("10.9916000"))
+        create_property(4, latitude=None, longitude=None)
+
+    def setUp(self):
+        cache.clear()
+
+    def ids(self, **params):
+        response = self.client.get("/api/properties/", {"sort": "price_asc", **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [item["id"] for item in response.json()["results"]]
+
+    def test_bbox(self):
+        self.assertEqual(self.ids(bbox="10.4,45.4,10.7,45.7"), [self.salo.id, self.sirmione.id])
+        self.assertEqual(self.ids(bbox="10.9,45.4,11.1,45.5"), [self.verona.id])
+        self.assertEqual(self.ids(bbox="-1,-1,1,1"), [])
+
+    def test_near(self):
+        self.assertEqual(self.ids(near="45.6064,10.5264", radius_km="5"), [self.salo.id])
+        self.assertEqual(self.ids(near="45.6064,10.5264", radius_km="20"), [self.salo.id, self.sirmione.id])
+        # radius_km defaults to 10; Sirmione is ~13km away
+        self.assertEqual(self.ids(near="45.6064,10.5264"), [self.salo.id])
+
+    def test_near_matches_haversine_at_the_edge(self):
+        distance = haversine_km(45.6064, 10.5264, float(self.sirmione.latitude), float(self.sirmione.longitude))
+        inside = self.ids(near="45.6064,10.5264", radius_km=str(distance + 0.001))
+        outside = self.ids(near="45.6064,10.5264", radius_km=str(distance - 0.001))
+        self.assertEqual(inside, [self.salo.id, self.sirmione.id])
+        self.assertEqual(outside, [self.salo.id])
+
+    def test_near_filters_in_sql(self):
+        # No candidate query while building, and no id list in the listing query
+        with self.assertNumQueries(0):
+            queryset = filter_properties(Property.objects.all(), {"near": "45.6064,10.5264", "radius_km": "20"})
+        self.assertNotIn(".\"id\" IN (", str(queryset.query))
+        self.assertEqual(sorted(queryset.values_list("id", flat=True)), [self.salo.id, self.sirmione.id])
+
+    def test_invalid_values_are_rejected(self):
+        for params in (
+            {"bbox": "10,46,11,45"},
+            {"bbox": "11,45,10,46"},
+            {"bbox": "10,45,11,nan"},
+            {"bbox": "10,45,11,inf"},
+            {"bbox": "10,-95,11,46"},
+            {"bbox": "10,45,11"},
+            {"near": "45.6,nan"},
+            {"near": "95,10"},
+            {"near": "45.6,10.5", "radius_km": "-1"},
+            {"near": "45.6,10.5", "radius_km": "nan"},
+            {"near": "45.6,10.5", "radius_km": str(MAX_RADIUS_KM + 1)},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get("/api/properties/", params).status_code, 400)
+        self.assertEqual(self.client.get("/api/properties/map/", {"bbox": "10,46,11,45"}).status_code, 400)
+
+
+class MapLayerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.salo = [create_property(i) for i in range(3)]
+        cls.verona = create_property(3, latitude=Decimal("45.4384000"), longitude=Decimal("10.9916000"))
+        create_property(4, is_active=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def layer(self, **params):
+        response = self.client.get("/api/properties/map/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_clusters_by_zoom(self):
+        # one world-sized cell holds every active listing
+        self.assertEqual(self.layer(zoom=0), {"zoom": 0, "clusters": [[45.5644, 10.6427, 4]], "pins": []})
+        # Salò's listings share a cell; Verona is on its own and becomes a pin
+        data = self.layer(zoom=10)
+        self.assertEqual(data["clusters"], [[45.6064, 10.5264, 3]])
+        self.assertEqual([pin[0] for pin in data["pins"]], [self.verona.id])
+        data = self.layer(zoom=16)
+        self.assertEqual(data["clusters"], [])
+        self.assertEqual(len(data["pins"]), 4)
+
+    def test_zoom_is_clamped(self):
+        self.assertEqual(self.layer(zoom=99)["zoom"], 16)
+        self.assertEqual(self.layer(zoom=-3)["zoom"], 0)
+        self.assertEqual(self.layer(zoom="x")["zoom"], 0)
+
+    def test_bbox_crops_the_layer(self):
+        data = self.layer(zoom=16, bbox="10.9,45.4,11.1,45.5")
+        self.assertEqual([pin[0] for pin in data["pins"]], [self.verona.id])
+
+
+class FacetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_property(1, property_type="villa", price=Decimal(250000), bedrooms=3)
+        create_property(2, property_type="villa", price=Decimal(700000), bedrooms=4, area=Decimal(250))
+        create_property(3, property_type="attico", price=Decimal(450000), location="Sirmione")
+        create_property(4, property_type="appartamento", price=Decimal(200000), location="Sirmione")
+        create_property(5, property_type="villa", is_active=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def facets(self, **params):
+        response = self.client.get("/api/properties/facets/", params)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return {
+            "count": data["count"],
+            **{
+                name: {item["value"]: item["count"] for item in data[name] if item["count"]}
+                for name in ("property_type", "location", "bedrooms", "price", "area")
+            },
+        }
+
+    def test_unfiltered(self):
+        self.assertEqual(self.facets(), {
+            "count": 4,
+            "property_type": {"villa": 2, "attico": 1, "appartamento": 1},
+            "location": {"Salò": 2, "Sirmione": 2},
+            "bedrooms": {2: 2, 3: 1, 4: 1},
+            "price": {"0-300000": 2, "300000-600000": 1, "600000-1000000": 1},
+            "area": {"50-100": 3, "200-400": 1},
+        })
+
+    def test_facet_ignores_its_own_filter(self):
+        data = self.facets(property_type="villa")
+        self.assertEqual(data["count"], 2)
+        self.assertEqual(data["property_type"], {"villa": 2, "attico": 1, "appartamento": 1})
+        # the other facets follow the type filter
+        self.assertEqual(data["location"], {"Salò": 2})
+        self.assertEqual(data["price"], {"0-300000": 1, "600000-1000000": 1})
+
+    def test_facets_combine_the_other_filters(self):
+        data = self.facets(location="sirmione", price_max="300000")
+        self.assertEqual(data["count"], 1)
+        self.assertEqual(data["property_type"], {"appartamento": 1})
+        self.assertEqual(data["location"], {"Salò": 1, "Sirmione": 1})
+        self.assertEqual(data["price"], {"0-300000": 1, "300000-600000": 1})
+        self.assertEqual(data["bedrooms"], {2: 1})
+
+    def test_search_query(self):
+        data = self.facets(q="sirmione", property_type="attico")
+        self.assertEqual(data["count"], 1)
+        self.assertEqual(data["property_type"], {"attico": 1, "appartamento": 1})
+
+
+class FastJSONTests(TestCase):
+    data = {
+        "price": Decimal("250000.50"),
+        "created_at": datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc),
+        "title": "Villa\u2028Salò",
+        "bedrooms": {2: "two"},
+        "images": [None, True],
+    }
+
+    def test_renders_like_drf(self):
+        body = FastJSONRenderer().render(self.data)
+        self.assertEqual(body, JSONRenderer().render(self.data))
+        self.assertIn(b"\\u2028", body)
+        self.assertIn(b'"2026-01-02T03:04:05Z"', body)
+
+    def test_indented_output_matches_drf(self):
+        for media_type in ("application/json; indent=2", "application/json; indent=4"):
+            with self.subTest(media_type=media_type):
+                self.assertEqual(
+                    FastJSONRenderer().render(self.data, media_type),
+                    JSONRenderer().render(self.data, media_type),
+                )
+
+    def test_parser(self):
+        parser = FastJSONParser()
+        self.assertEqual(parser.parse(BytesIO('{"a": [1, "ò"]}'.encode())), {"a": [1, "ò"]})
+        with self.assertRaises(ParseError):
+            parser.parse(BytesIO(b"{"))
+
+
+class RowSerializerTests(TestCase):
+    """The plain-dict path must render byte-identical JSON to the DRF serializers."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.properties = [
+            create_property(0),
+            create_property(
+                1, area=Decimal("80.50"), commercial_area=Decimal("95.25"), net_area=Decimal("70"),
+                condominium_fees=Decimal("120.50"), total_rooms=4, energy_class="B",
+                title={"it": "Attico", "en": "", "de": "Penthouse"}, main_image="",
+                latitude=None,
+            ),
+        ]
+        PropertyImage.objects.create(property=cls.properties[0], image="properties/gallery/a.png", order=1)
+        PropertyImage.objects.create(property=cls.properties[0], image="properties/gallery/b.png", order=0)
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_list_and_detail_match_drf_serializers(self):
+        ids = [prop.pk for prop in self.properties]
+        gallery = gallery_urls(ids)
+        for lang in ("it", "en", "de", "fr"):
+            request = Request(RequestFactory().get("/", {"lang": lang}))
+            objects = Property.objects.filter(pk__in=ids).order_by("id")
+            rows = list(objects.values(*DETAIL_COLUMNS))
+
+            expected = PropertyListSerializer(objects, many=True, context={"request": request}).data
+            actual = serialize_rows(rows, list_fields(lang))
+            self.assertEqual(self.render(actual), self.render(expected))
+
+            expected = PropertyDetailSerializer(objects, many=True, context={"request": request}).data
+            actual = serialize_rows(rows, detail_fields(lang, gallery))
+            self.assertEqual(self.render(actual), self.render(expected))
+
+            # Same payload when the language is picked in SQL
+            actual = serialize_rows(localized_detail_rows(objects, lang), detail_fields(lang, gallery))
+            self.assertEqual(self.render(actual), self.render(expected))
+
+
+class ListCardTests(TestCase):
+    """List responses built from list_cards must match the DRF list serializer."""
+
+    def setUp(self):
+        cache.clear()
+        create_property(0)
+        create_property(1, area=Decimal("80.50"), title={"it": "Attico", "en": "", "de": "Penthouse"})
+        # bulk_create bypasses save(), so this row has no cards yet
+        Property.objects.bulk_create([
+            Property(
+                title={"it": "Rustico", "en": "Farmhouse", "de": ""}, location="Gargnano",
+                price=Decimal("420000"), ref="RF: 99999", area=Decimal("150"),
+                main_image="properties/main/rustico.png",
+            ),
+        ])
+
+    def test_list_matches_serializer(self):
+        objects = Property.objects.order_by("-created_at")
+        for lang in ("it", "en", "de", "fr"):
+            request = Request(RequestFactory().get("/", {"lang": lang}))
+            expected = PropertyListSerializer(objects, many=True, context={"request": request}).data
+            response = self.client.get("/api/properties/", {"lang": lang})
+            self.assertEqual(
+                JSONRenderer().render(response.json()["results"]), JSONRenderer().render(expected),
+            )
+
+    def test_cards_follow_updates(self):
+        prop = Property.objects.get(ref="RF: 00000")
+        prop.price = Decimal("1250000")
+        prop.save(update_fields=["price"])
+        prop.refresh_from_db()
+        self.assertEqual(prop.list_cards["de"]["price"], "1.250.000€")
+
+    def test_cards_point_at_the_stored_upload(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with override_settings(MEDIA_ROOT=media_root):
+            uploads = [
+                create_property(index, main_image=SimpleUploadedFile("photo.png", b"\x89PNG"))
+                for index in (5, 6)
+            ]
+        # The second upload is renamed by the storage to avoid the first
+        self.assertNotEqual(uploads[0].main_image.name, uploads[1].main_image.name)
+        for prop in uploads:
+            prop.refresh_from_db()
+            self.assertEqual(prop.list_cards["it"]["image"], f"/media/{prop.main_image.name}")
+
+    def test_migration_backfill_matches_save(self):
+        backfill = import_module("properties.migrations.0006_property_list_cards").backfill_list_cards
+        expected = dict(Property.objects.exclude(list_cards={}).values_list("id", "list_cards"))
+        Property.objects.update(list_cards={})
+        backfill(django_apps, None)
+        actual = dict(Property.objects.filter(id__in=expected).values_list("id", "list_cards"))
+        self.assertEqual(actual, expected)
+        self.assertFalse(Property.objects.filter(list_cards={}).exists())
+
+
+@skipUnless(np is not None, "numpy is not installed")
+class SnapshotEngineTests(TestCase):
+    """Randomized differential test: the snapshot must answer exactly like the ORM."""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(15)
+        now = timezone.now()
+        locations = ["Salò", "SALÒ", "Sirmione", "Desenzano del Garda", "Gardone Riviera", "Toscolano"]
+        types = ["villa", "apartment", "rustico", ""]
+        for index in range(80):
+            prop = create_property(
+                index,
+                location=rng.choice(locations),
+                property_type=rng.choice(types),
+                # Few distinct values so ties exercise the id tie-breaker
+                price=Decimal(rng.choice([150000, 249999.5, 250000, 480000, 1200000])),
+                area=Decimal(rng.choice(["55", "80.50", "120", "240.25"])),
+                is_active=rng.random() > 0.1,
+            )
+            created = now - timedelta(days=rng.randrange(5))
+            Property.objects.filter(pk=prop.pk).update(created_at=created, updated_at=created)
+        cls.params = [cls.random_params(rng) for _ in range(150)]
+
+    @staticmethod
+    def random_params(rng):
+        choices = {
+            "location": ["sal", "SALÒ", "salò", "garda", "x", "Sirmione"],
+            "price_min": ["150000", "249999.50", "250000", "1e5", "0"],
+            "price_max": ["250000", "249999.5", "480000.00", "99"],
+            "property_type": ["villa", "apartment", "rustico", "castle"],
+            "sort": ["most_recent", "price_asc", "price_desc", "area_asc", "area_desc", "bogus"],
+            "page_size": ["5", "9", "50"],
+            "page": ["1", "2", "3", "last"],
+            "lang": ["it", "en", "de"],
+        }
+        return {name: rng.choice(values) for name, values in choices.items() if rng.random() < 0.5}
+
+    def get(self, params, engine):
+        # Same catalogue version for both engines, so ETags are comparable
+        cache.clear()
+        cache.set(CATALOGUE_VERSION_KEY, 1, None)
+        catalogue_snapshot.clear()
+        with override_settings(PROPERTY_SNAPSHOT_ENGINE=engine):
+            return self.client.get("/api/properties/", params)
+
+    def test_matches_orm(self):
+        for params in self.params:
+            with self.subTest(params=params):
+                expected, actual = self.get(params, False), self.get(params, True)
+                self.assertEqual(actual.status_code, expected.status_code)
+                self.assertEqual(actual.json(), expected.json())
+                self.assertEqual(actual.get("ETag"), expected.get("ETag"))
+                self.assertEqual(actual.get("Last-Modified"), expected.get("Last-Modified"))
+
+    @override_settings(PROPERTY_SNAPSHOT_ENGINE=True)
+    def test_list_without_queries(self):
+        cache.clear()
+        self.client.get("/api/properties/")
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/properties/", {"sort": "price_asc", "page": "2"})
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(PROPERTY_SNAPSHOT_ENGINE=True)
+    def test_reloads_on_catalogue_change(self):
+        cache.clear()
+        self.client.get("/api/properties/")
+        prop = Property.objects.filter(is_active=True).first()
+        prop.is_active = False
+        prop.save()
+        ids = [item["id"] for item in self.client.get("/api/properties/", {"page_size": "50"}).json()["results"]]
+        self.assertNotIn(prop.pk, ids)
+
+
+@skipUnless(np is not None, "numpy is not installed")
+class SimilarPropertiesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.base = create_property(0, price=Decimal("300000"), area=Decimal("100"), bedrooms=2)
+        cls.close = create_property(1, price=Decimal("310000"), area=Decimal("105"), bedrooms=2)
+        cls.far = create_property(
+            2, price=Decimal("2500000"), area=Decimal("600"), bedrooms=7, property_type="castle",
+            latitude=Decimal("46.4983000"), longitude=Decimal("11.3548000"),
+        )
+        cls.inactive = create_property(3, price=Decimal("300000"), area=Decimal("100"), is_active=False)
+        rebuild_similar()
+
+    def setUp(self):
+        cache.clear()
+
+    def similar(self, prop, **params):
+        response = self.client.get(f"/api/properties/{prop.pk}/similar/", params)
+        return [item["id"] for item in response.json()["results"]]
+
+    def test_neighbours_ranked_and_exclude_self(self):
+        neighbours = build_neighbours()
+        self.assertEqual(neighbours[self.base.pk], [self.close.pk, self.far.pk])
+        self.assertNotIn(self.inactive.pk, neighbours)
+
+    def test_blocks_do_not_change_the_result(self):
+        expected = build_neighbours()
+        for size in (1, 2):
+            with mock.patch("properties.similar.BLOCK_SIZE", size):
+                self.assertEqual(build_neighbours(), expected)
+
+    def test_endpoint_is_a_lookup(self):
+        get_catalogue_version()
+        # the stored neighbour ids, the validators aggregate, then the cards
+        with self.assertNumQueries(3):
+            self.assertEqual(self.similar(self.base, limit=1, lang="en"), [self.close.pk])
+
+    def test_served_from_the_stored_table(self):
+        newcomer = create_property(4, price=Decimal("305000"), area=Decimal("101"), bedrooms=2)
+        self.assertEqual(self.similar(self.base), [self.close.pk, self.far.pk])
+        self.assertEqual(self.similar(newcomer), [])
+        rebuild_similar()
+        self.assertEqual(self.similar(self.base), [newcomer.pk, self.close.pk, self.far.pk])
+        self.assertEqual(self.similar(newcomer)[0], self.base.pk)
+
+    def test_inactive_or_unknown_is_404(self):
+        self.assertEqual(self.client.get(f"/api/properties/{self.inactive.pk}/similar/").status_code, 404)
+        self.assertEqual(self.client.get("/api/properties/999999/similar/").status_code, 404)
+        self.assertEqual(self.client.get("/api/properties/%C2%B2/similar/").status_code, 404)
+
+
+class MarketStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(17)
+        for index in range(40):
+            create_property(
+                index,
+                location=rng.choice(["Salò", "Sirmione", "Garda"]),
+                property_type=rng.choice(["villa", "apartment"]),
+                price=Decimal(rng.randrange(100, 3000) * 1000),
+                area=Decimal(rng.randrange(40, 400)),
+                commercial_area=rng.choice([None, Decimal(rng.randrange(40, 400))]),
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def expected(self, group_by):
+        groups = {}
+        for prop in Property.objects.filter(is_active=True):
+            key = tuple(getattr(prop, field) for field in group_by)
+            surface = prop.commercial_area or prop.area
+            groups.setdefault(key, []).append(float(prop.price) / float(surface))
+        result = {}
+        for key, values in groups.items():
+            q1, median, q3 = statistics.quantiles(values, n=4, method="inclusive")
+            result[key] = {
+                "count": len(values),
+                "price_per_m2": {
+                    "min": round(min(values), 2), "q1": round(q1, 2), "median": round(median, 2),
+                    "q3": round(q3, 2), "max": round(max(values), 2),
+                },
+            }
+        return result
+
+    def test_matches_reference(self):
+        for group_by in ([], ["location"], ["property_type"], ["location", "property_type"]):
+            with self.subTest(group_by=group_by):
+                response = self.client.get("/api/properties/stats/", {"group_by": ",".join(group_by)})
+                data = response.json()
+                actual = {
+                    tuple(group[field] for field in group_by): {
+                        "count": group["count"], "price_per_m2": group["price_per_m2"],
+                    }
+                    for group in data["groups"]
+                }
+                self.assertEqual(data["group_by"], group_by)
+                self.assertEqual(actual, self.expected(group_by))
+
+    def test_python_fallback_matches_numpy(self):
+        group_bys = ((), ("location",), ("location", "property_type"))
+        market_data.clear()
+        with mock.patch("properties.market.np", None):
+            self.assertIsInstance(market_data.get(), MarketRows)
+            fallback = [market_data.get().aggregate(group_by) for group_by in group_bys]
+        market_data.clear()
+        self.assertEqual(fallback, [market_data.get().aggregate(group_by) for group_by in group_bys])
+
+    def test_cached_per_version(self):
+        self.client.get("/api/properties/stats/?group_by=location")
+        # only the validators aggregate of each request
+        with self.assertNumQueries(2):
+            self.client.get("/api/properties/stats/?group_by=location")
+            self.client.get("/api/properties/stats/?group_by=property_type")
+
+    def test_unknown_group(self):
+        self.assertEqual(self.client.get("/api/properties/stats/?group_by=price").status_code, 400)
+
+
+class LocationAutocompleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for index, location in enumerate(["Salò", "Salò", "SALO'", "Desenzano del Garda", "Gardone Riviera"]):
+            create_property(index, location=location)
+        create_property(9, location="Sirmione", is_active=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_location_key_is_folded(self):
+        self.assertEqual(Property.objects.get(ref="RF: 00003").location_key, "desenzano del garda")
+
+    def test_suggestions(self):
+        def suggest(prefix):
+            return self.client.get("/api/properties/locations/", {"prefix": prefix}).json()["results"]
+
+        self.assertEqual(suggest("salo"), [{"location": "Salò", "count": 2}, {"location": "SALO'", "count": 1}])
+        self.assertEqual(suggest("DESENZ"), [{"location": "Desenzano del Garda", "count": 1}])
+        # any word of the name can start the match
+        self.assertEqual(
+            [item["location"] for item in suggest("gard")], ["Desenzano del Garda", "Gardone Riviera"],
+        )
+        self.assertEqual(suggest("sirm"), [])
+
+    def test_list_filter_is_accent_insensitive(self):
+        response = self.client.get("/api/properties/", {"location": "salo"})
+        self.assertEqual(response.json()["count"], 3)
+        response = self.client.get("/api/properties/", {"location": "GARD"})
+        self.assertEqual(response.json()["count"], 2)
+
+
+class ChangeFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.properties = [create_property(index) for index in range(5)]
+
+    def feed(self, since="", **params):
+        return self.client.get("/api/properties/changes/", {"since": since, **params}).json()
+
+    def test_replay_then_delta(self):
+        data = self.feed(limit=3)
+        self.assertTrue(data["has_more"])
+        data = self.feed(data["token"], limit=3)
+        self.assertFalse(data["has_more"])
+        token = data["token"]
+        self.assertEqual(self.feed(token)["changes"], [])
+
+        updated, deactivated, deleted = self.properties[:3]
+        updated.price = Decimal("999000")
+        updated.save()
+        deactivated.is_active = False
+        deactivated.save()
+        deleted_pk = deleted.pk
+        deleted.delete()
+
+        # validators aggregate, the log page, the changed rows, their galleries
+        with self.assertNumQueries(4):
+            data = self.feed(token, lang="en")
+        changes = {change["id"]: change for change in data["changes"]}
+        self.assertEqual(set(changes), {updated.pk, deactivated.pk, deleted_pk})
+        self.assertEqual(changes[updated.pk]["action"], "upsert")
+        self.assertEqual(changes[updated.pk]["data"]["price"], "999.000€")
+        self.assertEqual(changes[deactivated.pk]["action"], "delete")
+        self.assertEqual(changes[deleted_pk], {**changes[deleted_pk], "action": "delete", "ref": "RF: 00002"})
+
+    def test_log_keeps_latest_entry_per_property(self):
+        prop = self.properties[0]
+        for price in (1, 2, 3):
+            prop.price = Decimal(price)
+            prop.save()
+        PropertyImage.objects.create(property=prop, image="properties/gallery/x.png")
+        self.assertEqual(PropertyChange.objects.filter(property_id=prop.pk).count(), 1)
+        self.assertEqual(PropertyChange.objects.count(), 5)
+
+    def test_invalid_token(self):
+        self.assertEqual(self.client.get("/api/properties/changes/?since=abc").status_code, 400)
+        self.assertEqual(self.client.get("/api/properties/changes/?since=%C2%B2").status_code, 400)
+
+
+class ServerRenderedListingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.properties = [create_property(index) for index in range(3)]
+        self.elsewhere = create_property(3, location="Sirmione")
+
+    def test_first_page_uses_list_filters(self):
+        response = self.client.get("/immobili/", {"location": "Sirmione", "lang": "en"})
+        self.assertContains(response, 'data-count="1" data-lang="en"')
+        self.assertContains(response, 'href="/details/%d"' % self.elsewhere.pk)
+        self.assertNotContains(response, 'href="/details/%d"' % self.properties[0].pk)
+
+        response = self.client.get("/")
+        self.assertContains(response, 'href="/details/%d/"' % self.properties[0].pk)
+
+    def test_invalid_filters_leave_the_listing_to_the_client(self):
+        response = self.client.get("/immobili/", {"price_min": "abc"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "data-count=")
+
+    def test_card_fragments_are_cached_per_property(self):
+        prop = self.properties[0]
+        self.client.get("/immobili/", {"lang": "de"})
+        key = fragment_key("listing", prop.pk, "de", prop.updated_at.timestamp())
+        self.assertIn("Villa 0", cache.get(key))
+
+        cache.set(key, "<i>cached card</i>")
+        self.assertContains(self.client.get("/immobili/", {"lang": "de"}), "<i>cached card</i>")
+
+        # Nothing deletes the old fragment (another worker may hold it); the key moves on
+        prop.title = {"it": "Rustico", "en": "Farmhouse", "de": "Bauernhaus"}
+        prop.save()
+        self.assertEqual(cache.get(key), "<i>cached card</i>")
+        response = self.client.get("/immobili/", {"lang": "de"})
+        self.assertContains(response, "Bauernhaus")
+        self.assertNotContains(response, "<i>cached card</i>")
+
+    def test_template_edit_changes_the_fragment_key(self):
+        stamp = self.properties[0].updated_at.timestamp()
+        key = fragment_key("listing", self.properties[0].pk, "it", stamp)
+        cache.set(key, "<i>stale card</i>")
+        touch(get_template(CARD_TEMPLATES["listing"]).origin.name, self)
+        self.assertNotEqual(fragment_key("listing", self.properties[0].pk, "it", stamp), key)
+        self.assertNotContains(self.client.get("/immobili/"), "<i>stale card</i>")
+
+
+class ServerRenderedDetailTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.prop = create_property(0, composition={"it": ["Soggiorno"], "en": ["Living room"], "de": []})
+        PropertyImage.objects.create(property=self.prop, image="properties/gallery/a.png", order=0)
+
+    def url(self, pk=None):
+        return f"/details/{pk or self.prop.pk}/"
+
+    def test_renders_detail(self):
+        response = self.client.get(self.url(), {"lang": "en"})
+        self.assertContains(response, '<div id="detail-content" data-lang="en">')
+        self.assertContains(response, "<title>Villa 0 | Gardablick</title>")
+        self.assertContains(response, "Living room")
+        self.assertContains(response, "properties/gallery/a.png")
+        self.assertContains(response, 'value="RF: 00000"')
+
+    def test_missing_and_inactive_are_404(self):
+        self.assertEqual(self.client.get(self.url(999999)).status_code, 404)
+        self.prop.is_active = False
+        self.prop.save()
+        response = self.client.get(self.url())
+        self.assertEqual(response.status_code, 404)
+        self.assertContains(response, 'id="detail-error"', status_code=404)
+
+    def test_fragment_is_cached_until_the_gallery_changes(self):
+        self.client.get(self.url(), {"lang": "de"})
+        # only the activity/stamp lookup
+        with self.assertNumQueries(1):
+            self.client.get(self.url(), {"lang": "de"})
+
+        key = fragment_key("detail", self.prop.pk, "de", detail_stamp(self.prop.pk))
+        PropertyImage.objects.create(property=self.prop, image="properties/gallery/b.png", order=1)
+        self.assertNotEqual(fragment_key("detail", self.prop.pk, "de", detail_stamp(self.prop.pk)), key)
+        self.assertContains(self.client.get(self.url(), {"lang": "de"}), "properties/gallery/b.png")
+
+    def test_cached_fragment_of_a_deactivated_listing_is_not_served(self):
+        self.client.get(self.url(), {"lang": "en"})
+        # As another worker sees it: no signal ran here, the fragment is still cached
+        Property.objects.filter(pk=self.prop.pk).update(is_active=False)
+        self.assertEqual(self.client.get(self.url(), {"lang": "en"}).status_code, 404)
+
+    def test_template_or_bundle_edit_renders_afresh(self):
+        stamp = detail_stamp(self.prop.pk)
+        for path in (get_template(DETAIL_TEMPLATE).origin.name, LOCALES_DIR / "en.json"):
+            with self.subTest(path=path):
+                key = fragment_key("detail", self.prop.pk, "en", stamp)
+                cache.set(key, {"html": "", "title": "Stale", "ref": "", "images": []})
+                self.assertContains(self.client.get(self.url(), {"lang": "en"}), "<title>Stale | Gardablick</title>")
+                touch(path, self)
+                self.assertNotEqual(fragment_key("detail", self.prop.pk, "en", stamp), key)
+                self.assertContains(self.client.get(self.url(), {"lang": "en"}), "<title>Villa 0 | Gardablick</title>")
@@ -1,13 +1,66 @@
+from django.db.models import Count, Max
+from django.http import Http404
 from rest_framework import viewsets
-from rest_framework.pagination import PageNumberPagination
-from .models import Property
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from config.conditional import conditional_response, make_etag
+from .cache import (
+    CatalogueMemo, detail_cache_key, get_cache_stats, get_cached_count, get_cached_for_filters,
+    get_cached_response, get_cached_responses, normalize_params, response_cache_key,
+    set_cached_response, set_cached_responses,
+)
+from .changes import DEFAULT_CHANGES, MAX_CHANGES, latest_change, parse_token, read_changes
+from .clusters import MAX_CLUSTER_ZOOM, get_map_layer
+from .facets import compute_facets
+from .filters import get_ordering, listing_queryset, parse_bbox
+from .locations import MAX_SUGGESTIONS, location_trie
+from .market import get_market_stats, parse_group_by
+from .models import Property, PropertyChange
+from .pagination import PropertyCursorPagination, PropertyPagination
+from .projections import project_list_rows
+from .row_serializers import (
+    DETAIL_KEYS, LIST_KEYS, detail_columns, detail_fields, gallery_urls, localized_detail_rows,
+    parse_fields, select_fields, serialize_rows, sparse,
+)
+from .similar import DEFAULT_SIMILAR, MAX_SIMILAR, similar_ids
+from .snapshot import catalogue_snapshot, snapshot_enabled
 from .serializers import PropertyListSerializer, PropertyDetailSerializer
 
 
-class PropertyPagination(PageNumberPagination):
-    page_size = 9
-    page_size_query_param = "page_size"
-    max_page_size = 50
+# Precomputed cards plus the sort keys the keyset paginator encodes; the
+# translation JSON blobs stay in the database
+LIST_FIELDS = ("id", "list_cards", "created_at", "price", "area")
+
+# Most listings a single /batch/ request may ask for
+BATCH_LIMIT = 100
+
+
+def build_ref_index():
+    return dict(Property.objects.filter(is_active=True).order_by().values_list("ref", "id"))
+
+
+# ref -> id of active listings, so ?refs= can use the per-id detail cache
+ref_index = CatalogueMemo(build_ref_index)
+
+
+def parse_pk(value):
+    """Integer primary key from a URL segment, or None if it is not one."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_batch_values(value, name):
+    """Comma-separated values, de-duplicated in order and capped at BATCH_LIMIT."""
+    values = list(dict.fromkeys(item.strip() for item in value.split(",") if item.strip()))
+    if not values:
+        raise ValidationError({name: "Provide at least one value."})
+    if len(values) > BATCH_LIMIT:
+        raise ValidationError({name: f"At most {BATCH_LIMIT} values per request."})
+    return values
 
 
 class PropertyViewSet(viewsets.ReadOnlyModelViewSet):
@@ -20,35 +73,327 @@ class PropertyViewSet(viewsets.ReadOnlyModelViewSet):
         return PropertyDetailSerializer
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        params = self.request.query_params
-
-        # Location filter
-        location = params.get("location")
-        if location:
-            queryset = queryset.filter(location__icontains=location)
-
-        # Price range filter
-        price_min = params.get("price_min")
-        price_max = params.get("price_max")
-        if price_min:
-            queryset = queryset.filter(price__gte=price_min)
-        if price_max:
-            queryset = queryset.filter(price__lte=price_max)
-
-        # Property type filter
-        property_type = params.get("property_type")
-        if property_type:
-            queryset = queryset.filter(property_type=property_type)
-
-        # Sorting
-        sort = params.get("sort", "most_recent")
-        sort_mapping = {
-            "most_recent": "-created_at",
-            "price_asc": "price",
-            "price_desc": "-price",
-            "area_asc": "area",
-            "area_desc": "-area",
-        }
-        order_by = sort_mapping.get(sort, "-created_at")
-        return queryset.order_by(order_by)
+        return listing_queryset(super().get_queryset(), self.request.query_params)
+
+    def _lang(self):
+        return self.request.query_params.get("lang", "it")
+
+    def _fields(self, available):
+        """Sparse fieldset from ``?fields=``; None means the full payload."""
+        return parse_fields(self.request.query_params.get("fields"), available)
+
+    @property
+    def paginator(self):
+        """Page-number pagination by default; keyset pagination on request."""
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            if params.get("pagination") == "cursor" or params.get("cursor"):
+                self._paginator = PropertyCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def _cached(self, build, pk=None):
+        """Serve a response from the versioned cache, building it on a miss."""
+        if self.action == "retrieve":
+            key = detail_cache_key(self.request, pk)
+        else:
+            key = response_cache_key(self.request, self.action, pk)
+        data = get_cached_response(key)
+        if data is not None:
+            return Response(data, headers={"X-Cache": "HIT"})
+        response = build()
+        if response.status_code == 200:
+            set_cached_response(key, response.data)
+        response["X-Cache"] = "MISS"
+        return response
+
+    def _stamp(self, queryset):
+        """MAX(updated_at), the count and the latest change-log entry of ``queryset``."""
+        # values() drops annotations such as search_rank from the aggregate
+        stamp = queryset.order_by().values("id").aggregate(
+            last_modified=Max("updated_at"), count=Count("id"),
+            last_change=Max(latest_change()), last_change_id=Max(latest_change("id")),
+        )
+        # Deletions and gallery edits do not touch updated_at, but they are logged
+        stamp["last_modified"] = max(
+            filter(None, (stamp["last_modified"], stamp["last_change"])), default=None,
+        )
+        return stamp
+
+    def _conditional(self, queryset, build, pk=None, stamp=None):
+        """Answer If-None-Match/If-Modified-Since from ``_stamp(queryset)``.
+
+        ``stamp`` supplies the values when they are already known (snapshot engine).
+        """
+        if stamp is None:
+            stamp = self._stamp(queryset)
+        etag = make_etag(
+            self.action, pk, stamp["last_change_id"], stamp["last_modified"], stamp["count"],
+            normalize_params(self.request.query_params),
+        )
+        return conditional_response(
+            self.request, lambda: self._cached(build, pk), etag, stamp["last_modified"],
+        )
+
+    def _catalogue_conditional(self, build, *parts):
+        """Conditional response for data derived from the whole active catalogue.
+
+        ``parts`` are the request values the payload depends on.
+        """
+        stamp = self._stamp(Property.objects.filter(is_active=True))
+        etag = make_etag(
+            self.action, stamp["last_change_id"], stamp["last_modified"], stamp["count"], *parts,
+        )
+        return conditional_response(self.request, build, etag, stamp["last_modified"])
+
+    def list(self, request, *args, **kwargs):
+        self._fields(LIST_KEYS)
+        result = self._snapshot_result()
+        if result is not None:
+            stamp = {
+                "last_modified": result.last_modified, "count": result.count,
+                "last_change_id": result.last_change_id,
+            }
+            return self._conditional(None, lambda: self._snapshot_list(result), stamp=stamp)
+        return self._conditional(self.filter_queryset(self.get_queryset()), self._list)
+
+    def _snapshot_result(self):
+        """Matches from the in-memory snapshot, or None when the ORM must answer."""
+        if not snapshot_enabled() or not isinstance(self.paginator, PropertyPagination):
+            return None
+        return catalogue_snapshot.get().select(self.request.query_params)
+
+    def _snapshot_list(self, result):
+        page = self.paginate_queryset(result.positions)
+        data = project_list_rows(result.rows(page if page is not None else result.positions), self._lang())
+        data = sparse(data, self._fields(LIST_KEYS))
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def _list(self):
+        """List payloads straight from the precomputed per-language cards."""
+        queryset = self.filter_queryset(self.get_queryset())
+        extra = ["search_rank"] if "search_rank" in queryset.query.annotations else []
+        rows = queryset.values(*LIST_FIELDS, *extra)
+        page = self.paginate_queryset(rows)
+        data = project_list_rows(page if page is not None else rows, self._lang())
+        data = sparse(data, self._fields(LIST_KEYS))
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs.get(self.lookup_field)
+        self._fields(DETAIL_KEYS)
+        queryset = self.get_queryset()
+        queryset = queryset.filter(pk=pk) if parse_pk(pk) is not None else queryset.none()
+        return self._conditional(queryset, lambda: self._retrieve(queryset), pk=pk)
+
+    def _retrieve(self, queryset):
+        """Detail payload from a values() row plus one gallery query."""
+        items = self._detail_items(queryset[:1])
+        if not items:
+            raise Http404
+        return Response(items[0])
+
+    def _detail_items(self, queryset):
+        """Detail payloads for ``queryset``, selecting only what ``?fields=`` asks for."""
+        return detail_items(queryset, self._lang(), self._fields(DETAIL_KEYS))
+
+    @action(detail=True, methods=["get"])
+    def similar(self, request, pk=None):
+        """List cards of the listings nearest to ``pk`` in the stored neighbour table."""
+        try:
+            limit = min(max(int(request.query_params.get("limit", DEFAULT_SIMILAR)), 1), MAX_SIMILAR)
+        except ValueError:
+            limit = DEFAULT_SIMILAR
+        requested = self._fields(LIST_KEYS)
+        pk = parse_pk(pk)
+        ids = similar_ids(pk, limit) if pk is not None else None
+        if ids is None:
+            raise Http404
+        # rebuild_similar rewrites the stored ids without a change-log entry, so they key the response
+        key = f"{pk}:{','.join(map(str, ids))}"
+        return self._catalogue_conditional(
+            lambda: self._cached(lambda: self._similar(ids), key),
+            pk, ids, self._lang(), requested and sorted(requested),
+        )
+
+    def _similar(self, ids):
+        rows = {row["id"]: row for row in Property.objects.filter(id__in=ids, is_active=True).values("id", "list_cards")}
+        data = project_list_rows([rows[pk] for pk in ids if pk in rows], self._lang())
+        return Response({"results": sparse(data, self._fields(LIST_KEYS))})
+
+    @action(detail=False, methods=["get"])
+    def batch(self, request):
+        """Detail payloads for ?ids=1,2,3 or ?refs=..., in the requested order.
+
+        Warm items come from the per-property detail cache; the rest are
+        read with one IN query plus one gallery query. Unknown or inactive
+        ids/refs are listed under "missing".
+        """
+        params = request.query_params
+        if params.get("refs"):
+            name, requested = "refs", parse_batch_values(params["refs"], "refs")
+            refs = ref_index.get()
+            ids = {ref: refs.get(ref) for ref in requested}
+        else:
+            pks = [parse_pk(value) for value in parse_batch_values(params.get("ids", ""), "ids")]
+            if None in pks:
+                raise ValidationError({"ids": "Ids must be integers."})
+            # "1" and "01" name the same listing
+            name, requested = "ids", list(dict.fromkeys(pks))
+            ids = {pk: pk for pk in requested}
+
+        fields = self._fields(DETAIL_KEYS)
+        return self._catalogue_conditional(
+            lambda: self._batch(name, requested, ids), name, requested, self._lang(), fields and sorted(fields),
+        )
+
+    def _batch(self, name, requested, ids):
+        keys = {pk: detail_cache_key(self.request, pk) for pk in set(ids.values()) if pk is not None}
+        cached = get_cached_responses(list(keys.values()))
+        items = {pk: cached[key] for pk, key in keys.items() if key in cached}
+
+        cold = [pk for pk in keys if pk not in items]
+        if cold:
+            fresh = self._detail_items(super().get_queryset().filter(id__in=cold))
+            items.update((item["id"], item) for item in fresh)
+            set_cached_responses({keys[item["id"]]: item for item in fresh})
+
+        return Response({
+            "results": [items[ids[value]] for value in requested if ids[value] in items],
+            "missing": [
+                ids[value] if name == "ids" else value
+                for value in requested if ids[value] not in items
+            ],
+        })
+
+    @action(detail=False, methods=["get"])
+    def changes(self, request):
+        """Listings created or updated since ?since=<token>, plus tombstones, and a fresh token.
+
+        Start without a token to replay the whole catalogue; keep calling
+        with the returned token while "has_more" is true.
+        """
+        since = parse_token(request.query_params.get("since"))
+        try:
+            limit = min(max(int(request.query_params.get("limit", DEFAULT_CHANGES)), 1), MAX_CHANGES)
+        except ValueError:
+            limit = DEFAULT_CHANGES
+        fields = self._fields(DETAIL_KEYS)
+        return self._catalogue_conditional(
+            lambda: self._changes(since, limit), since, limit, self._lang(), fields and sorted(fields),
+        )
+
+    def _changes(self, since, limit):
+        entries, token, has_more = read_changes(since, limit)
+        upserts = [entry.property_id for entry in entries if entry.action == PropertyChange.UPSERT]
+        items = {}
+        if upserts:
+            items = {item["id"]: item for item in self._detail_items(super().get_queryset().filter(id__in=upserts))}
+
+        changes = []
+        for entry in entries:
+            change = {"id": entry.property_id, "ref": entry.ref, "changed_at": entry.changed_at}
+            if entry.property_id in items:
+                change.update(action=PropertyChange.UPSERT, data=items[entry.property_id])
+            else:
+                # Deactivated or deleted, or gone since the entry was written
+                change["action"] = PropertyChange.DELETE
+            changes.append(change)
+        return Response({"token": token, "has_more": has_more, "changes": changes})
+
+    @action(detail=False, methods=["get"], url_path="cache-stats", permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        return Response(get_cache_stats())
+
+    @action(detail=False, methods=["get"], url_path="map")
+    def map(self, request):
+        """Compact map layer: clusters as [lat, lng, count], pins as [id, lat, lng, price]."""
+        try:
+            zoom = int(request.query_params.get("zoom", 0))
+        except ValueError:
+            zoom = 0
+        zoom = min(max(zoom, 0), MAX_CLUSTER_ZOOM)
+        bbox = request.query_params.get("bbox")
+        if bbox:
+            bbox = parse_bbox(bbox)
+        return self._catalogue_conditional(
+            lambda: Response({"zoom": zoom, **get_map_layer(zoom, bbox or None)}), zoom, bbox,
+        )
+
+    @action(detail=False, methods=["get"])
+    def stats(self, request):
+        """Price-per-m² count, min, quartiles and max, optionally per location and/or type."""
+        group_by = parse_group_by(request.query_params.get("group_by"))
+        return self._catalogue_conditional(lambda: Response(get_market_stats(group_by)), group_by)
+
+    @action(detail=False, methods=["get"])
+    def locations(self, request):
+        """Location suggestions with listing counts for an accent-insensitive ?prefix=."""
+        prefix = request.query_params.get("prefix", "")
+        try:
+            limit = min(max(int(request.query_params.get("limit", MAX_SUGGESTIONS)), 1), MAX_SUGGESTIONS)
+        except ValueError:
+            limit = MAX_SUGGESTIONS
+        return self._catalogue_conditional(
+            lambda: Response({"results": location_trie.get().suggest(prefix, limit)}), prefix, limit,
+        )
+
+    @action(detail=False, methods=["get"])
+    def facets(self, request):
+        """Counts per type, location, bedrooms and price/area bucket for the current filters."""
+        params = request.query_params
+        return Response(get_cached_for_filters(
+            "facets", params, lambda: compute_facets(self.queryset.all(), params),
+        ))
+
+
+def detail_items(queryset, lang, requested=None):
+    """Detail payloads for ``queryset`` in ``lang``, limited to the ``requested`` keys.
+
+    The gallery query only runs when gallery_images is part of the payload.
+    """
+    rows = list(localized_detail_rows(queryset, lang, detail_columns(requested)))
+    gallery = {}
+    if requested is None or "gallery_images" in requested:
+        gallery = gallery_urls([row["id"] for row in rows])
+    return serialize_rows(rows, select_fields(detail_fields(lang, gallery), requested))
+
+
+def list_payload(params):
+    """``{"count", "results"}`` for the first page of listings matching ``params``.
+
+    For server-rendered pages: filtering, ordering and the card projection
+    are the list API's, and the result is cached per catalogue version.
+    Each result also carries its row's ``updated_at`` for the fragment keys.
+    Returns None for filters the API would reject with a 400.
+    """
+    lang = params.get("lang", "it")
+    page_size = int(params["page_size"])
+
+    def build():
+        queryset = listing_queryset(Property.objects.filter(is_active=True), params)
+        rows = list(queryset.values(*LIST_FIELDS, "updated_at")[:page_size])
+        results = [
+            {**card, "updated_at": row["updated_at"]}
+            for card, row in zip(project_list_rows(rows, lang), rows)
+        ]
+        return {"count": get_cached_count(queryset, params), "results": results}
+
+    name = f"first_page:{get_ordering(params)}:{page_size}"
+    try:
+        return get_cached_for_filters(name, params, build)
+    except ValidationError:
+        return None
+
+
+def detail_payload(pk, lang):
+    """The /api/properties/<pk>/ payload in ``lang``, or None for missing and inactive listings."""
+    if parse_pk(pk) is None:
+        return None
+    items = detail_items(Property.objects.filter(is_active=True, pk=pk), lang)
+    return items[0] if items else None
@@ -0,0 +1,116 @@
+"""Locale bundles compiled once per process.
+
+Each bundle holds the parsed translations, the serialized JSON bytes and
+precompressed gzip (and, when the ``brotli`` package is installed, br)
+variants with one strong ETag per encoding. A bundle is rebuilt only when
+its file's mtime or size changes, so serving it is a stat, a dict lookup
+and a write.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.utils.http import quote_etag
+
+from .pages import subset
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - exercised only without brotli
+    brotli = None
+
+LOCALES_DIR = Path(__file__).resolve().parent / "locales"
+SUPPORTED_LOCALES = {"en", "it", "de"}
+
+# Preferred first when the client accepts several
+ENCODINGS = ("br", "gzip")
+
+# Compiled key subsets kept per bundle; arbitrary ?keys= lists are bounded by this
+MAX_SUBSETS = 128
+
+
+class LocaleBundle:
+    """Serialized and precompressed representations of one locale file."""
+
+    def __init__(self, data, stamp, last_modified):
+        self.data = data
+        self.stamp = stamp
+        self.last_modified = last_modified
+        self.variants = compile_variants(data)
+        self._subsets = {}
+
+    def subset_variants(self, keys):
+        """Compiled variants of the sub-bundle holding only ``keys`` (dotted paths)."""
+        keys = tuple(sorted(set(keys)))
+        variants = self._subsets.get(keys)
+        if variants is None:
+            if len(self._subsets) >= MAX_SUBSETS:
+                self._subsets = {}
+            variants = self._subsets[keys] = compile_variants(subset(self.data, keys))
+        return variants
+
+
+def compile_variants(data):
+    """``{encoding: (body, etag)}`` for a JSON payload; "identity" is uncompressed."""
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    variants = {"identity": (body, quote_etag(digest))}
+    variants["gzip"] = (gzip.compress(body, compresslevel=9, mtime=0), quote_etag(f"{digest}-gzip"))
+    if brotli is not None:
+        variants["br"] = (brotli.compress(body, quality=11), quote_etag(f"{digest}-br"))
+    return variants
+
+
+def accepted_encodings(request):
+    """Content codings the client accepts (q > 0), from Accept-Encoding."""
+    accepted = set()
+    for item in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        coding, _, params = item.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def negotiate(request, variants):
+    """Pick ``(encoding, body, etag)`` for the request's Accept-Encoding."""
+    accepted = accepted_encodings(request)
+    for encoding in ENCODINGS:
+        if encoding in variants and (encoding in accepted or "*" in accepted):
+            return (encoding, *variants[encoding])
+    return ("identity", *variants["identity"])
+
+
+_bundles = {}
+_lock = threading.Lock()
+
+
+def get_bundle(locale):
+    """The compiled bundle for ``locale``, or None if unsupported or missing."""
+    if locale not in SUPPORTED_LOCALES:
+        return None
+    path = LOCALES_DIR / f"{locale}.json"
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    bundle = _bundles.get(locale)
+    if bundle is None or bundle.stamp != stamp:
+        with _lock:
+            bundle = _bundles.get(locale)
+            if bundle is None or bundle.stamp != stamp:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                last_modified = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+                bundle = _bundles[locale] = LocaleBundle(data, stamp, last_modified)
+    return bundle
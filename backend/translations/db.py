@@ -0,0 +1,40 @@
+from django.db.models import Case, JSONField, Q, TextField, Value, When
+from django.db.models.fields.json import KeyTextTransform, KeyTransform
+from django.db.models.functions import Coalesce
+
+FALLBACK_LANG = "it"
+
+
+def localized(field_name, lang, fallback=FALLBACK_LANG, is_list=False):
+    """SQL expression picking one language out of a {"it": ..., "en": ...} JSON column.
+
+    Mirrors ``localize()``: an empty or null value in ``lang`` falls back to
+    ``fallback``, and a missing fallback yields "". String fields come back
+    as text, list fields (``is_list=True``) as decoded JSON.
+    """
+    if is_list:
+        pick, empty, missing, output_field = KeyTransform, [], Value('""'), JSONField()
+    else:
+        pick, empty, missing, output_field = KeyTextTransform, "", Value(""), TextField()
+
+    def translation(code):
+        # Compared as JSON: SQLite extracts a JSON null as the text 'null'
+        key = f"{field_name}__{code}"
+        return Case(
+            When(Q(**{key: None}) | Q(**{key: empty}), then=Value(None)),
+            default=pick(code, field_name),
+            output_field=output_field,
+        )
+
+    return Coalesce(translation(lang), translation(fallback), missing, output_field=output_field)
+
+
+def localized_values(fields, lang, suffix="_localized"):
+    """``{alias: expression}`` for annotating several translation fields at once.
+
+    ``fields`` maps field names to whether they hold lists.
+    """
+    return {
+        f"{name}{suffix}": localized(name, lang, is_list=is_list)
+        for name, is_list in fields.items()
+    }
@@ -0,0 +1,49 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from translations.bundles import SUPPORTED_LOCALES, get_bundle
+from translations.pages import PAGE_KEYS_FILE, TEMPLATES_DIR, scan_pages, subset
+
+
+class Command(BaseCommand):
+    help = "Scan the CMS page templates for translation keys and write the per-page key lists"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check", action="store_true",
+            help="Exit with an error instead of writing if the key lists are out of date",
+        )
+
+    def handle(self, *args, **options):
+        pages = scan_pages()
+        if not pages:
+            raise CommandError(f"No page templates found in {TEMPLATES_DIR}")
+        content = json.dumps(pages, indent=2, ensure_ascii=False) + "\n"
+
+        if options["check"]:
+            current = PAGE_KEYS_FILE.read_text(encoding="utf-8") if PAGE_KEYS_FILE.exists() else ""
+            if current != content:
+                raise CommandError(f"{PAGE_KEYS_FILE.name} is out of date; run build_translation_pages.")
+            self.stdout.write(self.style.SUCCESS(f"{PAGE_KEYS_FILE.name} is up to date."))
+            return
+
+        PAGE_KEYS_FILE.write_text(content, encoding="utf-8")
+        for locale in sorted(SUPPORTED_LOCALES):
+            bundle = get_bundle(locale)
+            if bundle is None:
+                continue
+            full = len(bundle.variants["identity"][0])
+            for page, keys in pages.items():
+                data = subset(bundle.data, keys)
+                size = len(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+                missing = len(keys) - _count_leaves(data)
+                note = f", {missing} key(s) missing" if missing else ""
+                self.stdout.write(f"{locale} {page:<18} {len(keys):>4} keys {size:>6} / {full} bytes{note}")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {PAGE_KEYS_FILE}"))
+
+
+def _count_leaves(data):
+    if isinstance(data, dict):
+        return sum(_count_leaves(value) for value in data.values())
+    return 1
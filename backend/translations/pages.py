@@ -0,0 +1,99 @@
+"""Translation keys used by each CMS page.
+
+``manage.py build_translation_pages`` scans the page templates (following
+``{% extends %}`` and ``{% include %}``) for ``data-i18n`` attributes and
+``t('...')`` calls and writes the per-page key lists to PAGE_KEYS_FILE.
+The translations endpoint then serves ``?page=<name>`` as a sub-bundle
+holding only those keys.
+"""
+import copy
+import json
+import re
+from pathlib import Path
+
+from django.conf import settings
+
+PAGE_KEYS_FILE = Path(__file__).resolve().parent / "page_keys.json"
+TEMPLATES_DIR = settings.BASE_DIR.parent / "cms_templates" / "templates"
+
+KEY_PATTERNS = (
+    re.compile(r"""data-i18n(?:-placeholder)?\s*=\s*["']([\w.-]+)["']"""),
+    # gardablickI18n.t('a.b') and page-local t('a.b') helpers; dotted keys only
+    re.compile(r"""(?:gardablickI18n\.|(?<![\w.$]))t\(\s*["']([\w-]+(?:\.[\w-]+)+)["']\s*\)"""),
+)
+INCLUDE_PATTERN = re.compile(r"""{%\s*(?:extends|include)\s+["']([^"']+)["']""")
+
+# Fragments a view renders into a page from Python (and caches) instead of
+# through {% include %}, so the scan cannot see them
+PAGE_FRAGMENTS = {
+    "index": ("includes/home-property-card.html",),
+    "immobili": ("includes/property-card.html",),
+    "property-detail": ("includes/property-detail-content.html",),
+}
+
+
+def template_keys(name, templates_dir=TEMPLATES_DIR, seen=None):
+    """Keys used by a template and everything it extends or includes."""
+    seen = set() if seen is None else seen
+    if name in seen:
+        return set()
+    seen.add(name)
+    try:
+        source = (templates_dir / name).read_text(encoding="utf-8")
+    except OSError:
+        return set()
+    keys = {key for pattern in KEY_PATTERNS for key in pattern.findall(source)}
+    for parent in INCLUDE_PATTERN.findall(source):
+        keys |= template_keys(parent, templates_dir, seen)
+    return keys
+
+
+def scan_pages(templates_dir=TEMPLATES_DIR):
+    """``{page: sorted keys}`` for every top-level page template except base.html."""
+    pages = {}
+    for path in sorted(templates_dir.glob("*.html")):
+        if path.name == "base.html":
+            continue
+        keys = template_keys(path.name, templates_dir)
+        for fragment in PAGE_FRAGMENTS.get(path.stem, ()):
+            keys |= template_keys(fragment, templates_dir)
+        pages[path.stem] = sorted(keys)
+    return pages
+
+
+_page_keys = (None, {})
+
+
+def get_page_keys():
+    """``{page: keys}`` from PAGE_KEYS_FILE, re-read only when the file changes."""
+    global _page_keys
+    try:
+        stat = PAGE_KEYS_FILE.stat()
+    except OSError:
+        return {}
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    if _page_keys[0] != stamp:
+        try:
+            with open(PAGE_KEYS_FILE, "r", encoding="utf-8") as f:
+                _page_keys = (stamp, json.load(f))
+        except (OSError, ValueError):
+            return {}
+    return _page_keys[1]
+
+
+def subset(data, keys):
+    """The nested part of ``data`` reachable through dotted ``keys``; unknown keys are skipped."""
+    result = {}
+    for key in keys:
+        parts = key.split(".")
+        source = data
+        for part in parts:
+            if not isinstance(source, dict) or part not in source:
+                break
+            source = source[part]
+        else:
+            target = result
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = copy.deepcopy(source)
+    return result
@@ -0,0 +1,115 @@
+import gzip
+import json
+from unittest import skipUnless
+
+from django.test import TestCase
+
+from properties.models import Property
+from properties.serializers import localize
+
+from .bundles import LOCALES_DIR, brotli, get_bundle
+from .db import localized_values
+from .pages import get_page_keys, subset
+from .views import MAX_KEYS
+
+
+class TranslationBundleTests(TestCase):
+    url = "/api/translations/en/"
+
+    def get(self, encoding="", **headers):
+        return self.client.get(self.url, HTTP_ACCEPT_ENCODING=encoding, **headers)
+
+    def test_encodings(self):
+        expected = json.loads((LOCALES_DIR / "en.json").read_text(encoding="utf-8"))
+        identity = self.get()
+        self.assertNotIn("Content-Encoding", identity)
+        self.assertEqual(json.loads(identity.content), expected)
+        self.assertIn("Accept-Encoding", identity["Vary"])
+
+        response = self.get("deflate, gzip;q=0.5")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(response.content)), expected)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        # refused codings fall back to identity
+        self.assertNotIn("Content-Encoding", self.get("gzip;q=0, br;q=0"))
+
+    @skipUnless(brotli is not None, "brotli is not installed")
+    def test_brotli_preferred(self):
+        for encoding in ("gzip, br", "*"):
+            with self.subTest(encoding=encoding):
+                response = self.get(encoding)
+                self.assertEqual(response["Content-Encoding"], "br")
+                self.assertEqual(brotli.decompress(response.content), self.get().content)
+
+    def test_etag_per_encoding(self):
+        identity, gzipped = self.get(), self.get("gzip")
+        self.assertNotEqual(identity["ETag"], gzipped["ETag"])
+        self.assertEqual(self.get()["ETag"], identity["ETag"])
+        self.assertIn("Last-Modified", identity)
+
+        response = self.get("gzip", HTTP_IF_NONE_MATCH=gzipped["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        # another encoding's ETag does not validate this one
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=gzipped["ETag"]).status_code, 200)
+
+    def test_if_modified_since(self):
+        last_modified = self.get()["Last-Modified"]
+        response = self.get(HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_subset_revalidation(self):
+        page = self.client.get(self.url, {"page": "immobili"})
+        keys = self.client.get(self.url, {"keys": "details.bedrooms"})
+        self.assertNotEqual(page["ETag"], keys["ETag"])
+        response = self.client.get(self.url, {"page": "immobili"}, HTTP_IF_NONE_MATCH=page["ETag"])
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(self.url, {"keys": "details.bedrooms"}, HTTP_IF_NONE_MATCH=page["ETag"])
+        self.assertEqual(response.status_code, 200)
+
+    def test_unsupported_locale(self):
+        self.assertEqual(self.client.get("/api/translations/fr/").status_code, 400)
+
+    def test_page_subset(self):
+        data = self.client.get(self.url, {"page": "immobili"}).json()
+        self.assertEqual(data, subset(get_bundle("en").data, get_page_keys()["immobili"]))
+        self.assertIn("acceptAll", data["cookie"])
+        self.assertNotIn("details", data)
+        self.assertEqual(self.client.get(self.url, {"page": "nope"}).status_code, 404)
+
+    def test_keys_subset(self):
+        data = self.client.get(self.url, {"keys": "details.bedrooms, details.bathrooms,missing.key"}).json()
+        self.assertEqual(set(data), {"details"})
+        self.assertEqual(sorted(data["details"]), ["bathrooms", "bedrooms"])
+        response = self.client.get(self.url, {"page": "immobili", "keys": "details.bedrooms"})
+        self.assertEqual(set(response.json()["details"]), {"bedrooms"})
+
+    def test_key_limit_includes_page_keys(self):
+        def keys(count):
+            return ",".join(f"extra.key{index}" for index in range(count))
+
+        self.assertEqual(self.client.get(self.url, {"keys": keys(MAX_KEYS)}).status_code, 200)
+        self.assertEqual(self.client.get(self.url, {"keys": keys(MAX_KEYS + 1)}).status_code, 400)
+        room = MAX_KEYS - len(set(get_page_keys()["index"]))
+        self.assertEqual(self.client.get(self.url, {"page": "index", "keys": keys(room)}).status_code, 200)
+        self.assertEqual(self.client.get(self.url, {"page": "index", "keys": keys(room + 1)}).status_code, 400)
+
+
+class LocalizedExpressionTests(TestCase):
+    def test_sql_fallback_matches_localize(self):
+        prop = Property.objects.create(
+            title={"it": "Villa", "en": "", "de": None},
+            description={"en": "English only"},
+            composition={"it": ["Soggiorno", "Cucina"], "en": [], "de": ["Küche"]},
+            composition_note={},
+            location_note={"it": "", "en": 'Quoted "lake" \\ view'},
+            location="Salò", price=250000, ref="RF: 1", area=80, main_image="properties/main/a.png",
+        )
+        fields = {"title": False, "description": False, "composition": True,
+                  "composition_note": False, "location_note": False}
+        for lang in ("it", "en", "de", "fr"):
+            row = Property.objects.filter(pk=prop.pk).values(**localized_values(fields, lang, suffix="_sql")).get()
+            for name in fields:
+                with self.subTest(lang=lang, field=name):
+                    self.assertEqual(row[f"{name}_sql"], localize(getattr(prop, name), lang))
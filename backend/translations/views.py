@@ -1,21 +1,64 @@
-import json
-from pathlib import Path
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import patch_vary_headers
+from config.conditional import conditional
+from .bundles import SUPPORTED_LOCALES, get_bundle, negotiate
+from .pages import get_page_keys
 
+# Upper bound on keys per request, ?page= keys included
+MAX_KEYS = 200
 
-LOCALES_DIR = Path(__file__).resolve().parent / "locales"
-SUPPORTED_LOCALES = {"en", "it", "de"}
 
+def requested_variants(request, locale):
+    """``(variants, last_modified)`` for the full bundle or its ?page= / ?keys= subset.
 
-def get_translations(request, locale):
+    Returns ``(None, error response)`` when the request cannot be served.
+    """
     if locale not in SUPPORTED_LOCALES:
-        return JsonResponse({"error": f"Unsupported locale: {locale}"}, status=400)
+        return None, JsonResponse({"error": f"Unsupported locale: {locale}"}, status=400)
+
+    bundle = get_bundle(locale)
+    if bundle is None:
+        return None, JsonResponse({"error": f"Locale file not found: {locale}"}, status=404)
+
+    page = request.GET.get("page")
+    keys = [key.strip() for key in request.GET.get("keys", "").split(",") if key.strip()]
+    if page:
+        page_keys = get_page_keys().get(page)
+        if page_keys is None:
+            return None, JsonResponse({"error": f"Unknown page: {page}"}, status=404)
+        keys += page_keys
+    # Counted after merging so ?page= cannot carry an unbounded ?keys= list
+    if len(set(keys)) > MAX_KEYS:
+        return None, JsonResponse({"error": f"At most {MAX_KEYS} keys per request"}, status=400)
+    if page or keys:
+        return bundle.subset_variants(keys), bundle.last_modified
+    return bundle.variants, bundle.last_modified
+
 
-    locale_file = LOCALES_DIR / f"{locale}.json"
-    if not locale_file.exists():
-        return JsonResponse({"error": f"Locale file not found: {locale}"}, status=404)
+def locale_validators(request, locale):
+    """Strong ETag of the negotiated encoding and the file's mtime, from the compiled bundle."""
+    variants, last_modified = requested_variants(request, locale)
+    if variants is None:
+        return None, None
+    _, _, etag = negotiate(request, variants)
+    return etag, last_modified
 
-    with open(locale_file, "r", encoding="utf-8") as f:
-        translations = json.load(f)
 
-    return JsonResponse(translations)
+def bundle_response(request, variants):
+    """Serve a precompressed JSON payload in the best encoding the client accepts."""
+    encoding, body, _ = negotiate(request, variants)
+    response = HttpResponse(body, content_type="application/json")
+    if encoding != "identity":
+        response["Content-Encoding"] = encoding
+    response["Content-Length"] = str(len(body))
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+@conditional(locale_validators)
+def get_translations(request, locale):
+    """Full locale bundle, or the keys of one page (?page=immobili) or a list (?keys=a.b,c)."""
+    variants, error = requested_variants(request, locale)
+    if variants is None:
+        return error
+    return bundle_response(request, variants)
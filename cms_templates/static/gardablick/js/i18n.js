@@ -57,10 +57,16 @@
     }
   }
 
-  /** Fetch translations from the API */
+  /**
+   * Fetch translations from the API. Pages declare their name on <body>
+   * (data-i18n-page) and only receive the keys their templates use.
+   */
   function fetchTranslations(locale, callback) {
+    var page = document.body && document.body.getAttribute("data-i18n-page");
+    var url = API_BASE + "/translations/" + locale + "/";
+    if (page) url += "?page=" + encodeURIComponent(page);
     var xhr = new XMLHttpRequest();
-    xhr.open("GET", API_BASE + "/translations/" + locale + "/");
+    xhr.open("GET", url);
     xhr.onload = function () {
       if (xhr.status === 200) {
         try {
@@ -77,6 +83,32 @@
     xhr.send();
   }
 
+  /**
+   * Use the translations the server rendered into #i18n-data when they are
+   * for the requested locale; returns false if they are missing or stale.
+   */
+  function readInlineTranslations(locale) {
+    var el = document.getElementById("i18n-data");
+    if (!el || el.getAttribute("data-locale") !== locale) return false;
+    try {
+      translations = JSON.parse(el.textContent);
+    } catch (e) {
+      return false;
+    }
+    return true;
+  }
+
+  /** Singleton page content the server rendered into #page-data, or null */
+  function pageData() {
+    var el = document.getElementById("page-data");
+    if (!el) return null;
+    try {
+      return JSON.parse(el.textContent);
+    } catch (e) {
+      return null;
+    }
+  }
+
   /** Update the active language indicator in header */
   function updateLangIndicators() {
     var allLangs = document.querySelectorAll("[data-lang]");
@@ -130,6 +162,11 @@
     document.cookie = "locale=" + currentLocale + ";path=/;max-age=31536000";
     document.documentElement.setAttribute("lang", currentLocale);
 
+    if (readInlineTranslations(currentLocale)) {
+      applyTranslations();
+      updateLangIndicators();
+      return;
+    }
     fetchTranslations(currentLocale, function () {
       applyTranslations();
       updateLangIndicators();
@@ -321,5 +358,6 @@
     setLocale: setLocale,
     t: t,
     applyTranslations: applyTranslations,
+    pageData: pageData,
   };
 })();